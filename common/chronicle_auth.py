@@ -26,16 +26,41 @@ https://requests.readthedocs.io
 """
 
 import argparse
+import functools
 import pathlib
-from typing import Optional, Sequence, Union
+from typing import Dict, Optional, Sequence, Tuple, Union
 
 from google.auth.transport import requests
 from google.oauth2 import service_account
+from requests import adapters
 
 DEFAULT_CREDENTIALS_FILE = pathlib.Path.home() / ".chronicle_credentials.json"
 
 AUTHORIZATION_SCOPES = ["https://www.googleapis.com/auth/chronicle-backstory"]
 
+# Connection pool sizes of cached sessions, which may be shared by concurrent
+# callers. When all the connections to a host are busy, callers wait for one of
+# them instead of opening (and then discarding) extra short-lived connections.
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 64
+
+# Sessions created by get_cached_http_session(), keyed by the credentials file
+# path and the OAuth scopes.
+_SESSION_CACHE: Dict[Tuple[str, Tuple[str, ...]],
+                     requests.AuthorizedSession] = {}
+
+
+@functools.lru_cache(maxsize=4)
+def _credentials(credentials_file_path: str,
+                 scopes: Tuple[str, ...]) -> service_account.Credentials:
+  """Loads service account credentials once per file and scopes.
+
+  Sharing the same Credentials object between sessions also shares its access
+  token, which is refreshed automatically when it expires.
+  """
+  return service_account.Credentials.from_service_account_file(
+      credentials_file_path, scopes=list(scopes))
+
 
 def initialize_http_session(
     credentials_file_path: Optional[Union[str, pathlib.Path]],
@@ -53,18 +78,60 @@ def initialize_http_session(
 
   Returns:
     HTTP session object to send authorized requests and receive responses.
+    The credentials file is read only once per process, and sessions with the
+    same file and scopes share the same credentials.
 
   Raises:
     OSError: Failed to read the given file, e.g. not found, no read access
       (https://docs.python.org/library/exceptions.html#os-exceptions).
     ValueError: Invalid file contents.
   """
-  credentials = service_account.Credentials.from_service_account_file(
+  credentials = _credentials(
       str(credentials_file_path or DEFAULT_CREDENTIALS_FILE),
-      scopes=scopes or AUTHORIZATION_SCOPES)
+      tuple(scopes or AUTHORIZATION_SCOPES))
   return requests.AuthorizedSession(credentials)
 
 
+def get_cached_http_session(
+    credentials_file_path: Optional[Union[str, pathlib.Path]],
+    scopes: Optional[Sequence[str]] = None) -> requests.AuthorizedSession:
+  """Returns an authorized HTTP session that is reused across calls.
+
+  Unlike initialize_http_session(), repeated calls with the same credentials
+  file and scopes return the same session object, so callers that send many
+  requests (e.g. a loop over many assets or IoCs) reuse its keep-alive TCP/TLS
+  connections instead of opening new ones. Likewise, scripts that import and
+  call several samples in the same process (e.g. udm_search() followed by
+  delete_gcp_association()) should get their session from here, so the OAuth
+  token exchange happens only once for all of them.
+
+  Args:
+    credentials_file_path: Same as in initialize_http_session().
+    scopes: Same as in initialize_http_session().
+
+  Returns:
+    HTTP session object to send authorized requests and receive responses.
+
+  Raises:
+    OSError: Failed to read the given file, e.g. not found, no read access
+      (https://docs.python.org/library/exceptions.html#os-exceptions).
+    ValueError: Invalid file contents.
+  """
+  key = (str(credentials_file_path or DEFAULT_CREDENTIALS_FILE),
+         tuple(scopes or AUTHORIZATION_SCOPES))
+  session = _SESSION_CACHE.get(key)
+  if session is None:
+    session = initialize_http_session(key[0], scopes=list(key[1]))
+    session.mount(
+        "https://",
+        adapters.HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            pool_block=True))
+    _SESSION_CACHE[key] = session
+  return session
+
+
 def add_argument_credentials_file(parser: argparse.ArgumentParser):
   """Adds a shared command-line argument to all the sample modules."""
   parser.add_argument(
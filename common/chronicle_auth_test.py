@@ -28,6 +28,7 @@ class ChronicleAuthTest(unittest.TestCase):
 
   def setUp(self):
     super().setUp()
+    chronicle_auth._credentials.cache_clear()
     fd, self.path = tempfile.mkstemp(suffix=".json", text=True)
     fake_json_credentials = b"""{
         "client_email": "fake-username@fake-project.iam.gserviceaccount.com",
@@ -90,6 +91,31 @@ class ChronicleAuthTest(unittest.TestCase):
     mock_from_service_account_file.assert_called_once_with(
         self.path, scopes=scopes)
 
+  @mock.patch.object(service_account.Credentials, "from_service_account_file")
+  def test_initialize_http_session_shares_credentials(
+      self, mock_from_service_account_file):
+    session_1 = chronicle_auth.initialize_http_session(self.path)
+    session_2 = chronicle_auth.initialize_http_session(self.path)
+    self.assertIsNot(session_1, session_2)
+    self.assertIs(session_1.credentials, session_2.credentials)
+    mock_from_service_account_file.assert_called_once()
+
+  @mock.patch.object(service_account.Credentials, "from_service_account_file")
+  def test_get_cached_http_session(self, mock_from_service_account_file):
+    self.addCleanup(chronicle_auth._SESSION_CACHE.clear)
+    session = chronicle_auth.get_cached_http_session(self.path)
+    self.assertIs(chronicle_auth.get_cached_http_session(self.path), session)
+    mock_from_service_account_file.assert_called_once_with(
+        self.path, scopes=chronicle_auth.AUTHORIZATION_SCOPES)
+    adapter = session.get_adapter("https://backstory.googleapis.com")
+    self.assertEqual(adapter._pool_maxsize, chronicle_auth.POOL_MAXSIZE)
+    self.assertTrue(adapter._pool_block)
+
+    # Different scopes require a different session.
+    scopes = ["https://www.googleapis.com/auth/malachite-ingestion"]
+    other_session = chronicle_auth.get_cached_http_session(self.path, scopes)
+    self.assertIsNot(other_session, session)
+
   def tearDown(self):
     os.remove(self.path)
     super().tearDown()
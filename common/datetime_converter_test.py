@@ -37,6 +37,13 @@ class DatetimeConverterTest(unittest.TestCase):
     date_time_str = datetime_converter.strftime(self.date_time)
     self.assertEqual(date_time_str, expected_date_time_str)
 
+  def test_strftime_other_timezone_and_microseconds(self):
+    date_time = datetime.datetime(
+        2020, 11, 5, 2, 0, 0, 123456,
+        tzinfo=datetime.timezone(datetime.timedelta(hours=2)))
+    self.assertEqual(
+        datetime_converter.strftime(date_time), "2020-11-05T00:00:00Z")
+
 
 if __name__ == "__main__":
   unittest.main()
@@ -0,0 +1,97 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Helper functions to parse and serialize large JSON documents quickly.
+
+These functions use the "orjson" library if it's installed, which is much
+faster than the builtin "json" module for large API responses, and fall back
+to the builtin "json" module otherwise. Similarly, iter_items() parses
+responses incrementally with the "ijson" library if it's installed.
+
+https://github.com/ijl/orjson
+https://github.com/ICRAR/ijson
+"""
+
+import json
+from typing import Any, BinaryIO, Iterator, Sequence, TextIO, Union
+
+try:
+  import orjson  # pylint: disable=g-import-not-at-top
+except ImportError:
+  orjson = None
+
+try:
+  import ijson  # pylint: disable=g-import-not-at-top
+except ImportError:
+  ijson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+  """Parses a JSON document, e.g. the raw content of an HTTP response."""
+  if orjson is not None:
+    return orjson.loads(data)
+  return json.loads(data)
+
+
+def dumps(obj: Any) -> str:
+  """Serializes an object into an indented (human-readable) JSON string."""
+  if orjson is not None:
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+  return json.dumps(obj, indent=2)
+
+
+def iter_items(fp: BinaryIO, key: str) -> Iterator[Any]:
+  """Yields the items of a list in a JSON object that is read from a stream.
+
+  With "ijson", the stream is parsed incrementally, so only one item at a time
+  is held in memory, and parsing overlaps with reading the rest of the stream
+  (e.g. an HTTP response body). Without it, the whole document is parsed first.
+
+  Args:
+    fp: Binary stream of a JSON object, e.g. the "raw" attribute of a streamed
+      HTTP response.
+    key: Name of the top-level field which contains the list.
+
+  Yields:
+    The items of the list, in order. Nothing if the field is missing.
+    Non-integer numbers are floats either way, like in loads().
+  """
+  if ijson is not None:
+    # Without "use_float", ijson yields decimal.Decimal numbers, which dumps()
+    # can't serialize.
+    yield from ijson.items(fp, f"{key}.item", use_float=True)
+  else:
+    yield from loads(fp.read()).get(key) or []
+
+
+def dump_list(items: Sequence[Any], fp: TextIO):
+  """Writes a list as an indented JSON array to a text stream, item by item.
+
+  The output is the same as dumps(items), but the whole document is never
+  built in memory, so large lists (e.g. 10,000 UDM events) are written with a
+  bounded amount of memory, and can be piped to other tools incrementally.
+
+  Args:
+    items: List of JSON-serializable objects.
+    fp: Text stream, e.g. sys.stdout.
+  """
+  if not items:
+    fp.write("[]\n")
+    return
+  separator = "[\n  "
+  for item in items:
+    fp.write(separator)
+    fp.write(dumps(item).replace("\n", "\n  "))
+    separator = ",\n  "
+  fp.write("\n]\n")
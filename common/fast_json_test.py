@@ -0,0 +1,82 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Tests for the "fast_json" module."""
+
+import io
+import json
+import unittest
+from unittest import mock
+
+from . import fast_json
+
+DOCUMENT = {"events": [{"name": "a", "count": 1}, {"name": "b", "ok": True}]}
+
+
+class FastJsonTest(unittest.TestCase):
+
+  def test_loads(self):
+    self.assertEqual(fast_json.loads(json.dumps(DOCUMENT).encode()), DOCUMENT)
+
+  def test_dumps(self):
+    self.assertEqual(json.loads(fast_json.dumps(DOCUMENT)), DOCUMENT)
+    self.assertIn('\n  "events"', fast_json.dumps(DOCUMENT))
+
+  def test_dump_list(self):
+    for items in ([], DOCUMENT["events"], [[1, {"a": []}], "b"]):
+      fp = io.StringIO()
+      fast_json.dump_list(items, fp)
+      self.assertEqual(fp.getvalue(), json.dumps(items, indent=2) + "\n")
+
+  def test_iter_items(self):
+    fp = io.BytesIO(json.dumps(DOCUMENT).encode())
+    self.assertEqual(
+        list(fast_json.iter_items(fp, "events")), DOCUMENT["events"])
+    fp = io.BytesIO(b"{}")
+    self.assertEqual(list(fast_json.iter_items(fp, "events")), [])
+
+  def test_iter_items_float(self):
+    fp = io.BytesIO(b'{"events": [{"score": 0.5}]}')
+    actual = list(fast_json.iter_items(fp, "events"))
+    self.assertEqual(actual, [{"score": 0.5}])
+    self.assertIsInstance(actual[0]["score"], float)
+    self.assertEqual(json.loads(fast_json.dumps(actual)), [{"score": 0.5}])
+
+  def test_iter_items_with_ijson(self):
+    mock_ijson = mock.Mock()
+    mock_ijson.items.return_value = iter([{"score": 0.5}])
+    fp = io.BytesIO(b'{"events": [{"score": 0.5}]}')
+    with mock.patch.object(fast_json, "ijson", mock_ijson):
+      actual = list(fast_json.iter_items(fp, "events"))
+    self.assertEqual(actual, [{"score": 0.5}])
+    mock_ijson.items.assert_called_once_with(fp, "events.item", use_float=True)
+
+  @mock.patch.object(fast_json, "ijson", None)
+  def test_iter_items_without_ijson(self):
+    fp = io.BytesIO(json.dumps(DOCUMENT).encode())
+    self.assertEqual(
+        list(fast_json.iter_items(fp, "events")), DOCUMENT["events"])
+
+  @mock.patch.object(fast_json, "orjson", None)
+  def test_without_orjson(self):
+    self.assertEqual(fast_json.loads(json.dumps(DOCUMENT).encode()), DOCUMENT)
+    self.assertEqual(fast_json.dumps(DOCUMENT), json.dumps(DOCUMENT, indent=2))
+    fp = io.StringIO()
+    fast_json.dump_list(DOCUMENT["events"], fp)
+    self.assertEqual(fp.getvalue(),
+                     json.dumps(DOCUMENT["events"], indent=2) + "\n")
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,41 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Helper function to check HTTP responses, and report errors concisely."""
+
+import sys
+
+from google.auth.transport import requests
+
+# Maximum number of bytes of an error response to show, because error details
+# may be large (e.g. an HTML page).
+MAX_ERROR_PREVIEW_BYTES = 2048
+
+
+def raise_for_status(response: requests.requests.Response):
+  """Raises an HTTPError if the response has an error status code.
+
+  Before that, the beginning of the error details is written to stderr.
+
+  Args:
+    response: HTTP response.
+
+  Raises:
+    requests.exceptions.HTTPError: HTTP request resulted in an error
+    (response.status_code >= 400).
+  """
+  if response.status_code >= 400:
+    preview = response.content[:MAX_ERROR_PREVIEW_BYTES]
+    sys.stderr.write(preview.decode("utf-8", "replace") + "\n")
+  response.raise_for_status()
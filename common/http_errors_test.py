@@ -0,0 +1,56 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Tests for the "http_errors" module."""
+
+import io
+import unittest
+from unittest import mock
+
+from google.auth.transport import requests
+
+from . import http_errors
+
+
+class HttpErrorsTest(unittest.TestCase):
+
+  @mock.patch("sys.stderr", new_callable=io.StringIO)
+  def test_raise_for_status_error(self, mock_stderr):
+    response = mock.Mock(status_code=400, content=b"x" * 10000 + b"\xff")
+    response.raise_for_status.side_effect = (
+        requests.requests.exceptions.HTTPError())
+    with self.assertRaises(requests.requests.exceptions.HTTPError):
+      http_errors.raise_for_status(response)
+    self.assertEqual(mock_stderr.getvalue(),
+                     "x" * http_errors.MAX_ERROR_PREVIEW_BYTES + "\n")
+
+  @mock.patch("sys.stderr", new_callable=io.StringIO)
+  def test_raise_for_status_invalid_utf8(self, mock_stderr):
+    response = mock.Mock(status_code=500, content=b"bad \xff")
+    response.raise_for_status.side_effect = (
+        requests.requests.exceptions.HTTPError())
+    with self.assertRaises(requests.requests.exceptions.HTTPError):
+      http_errors.raise_for_status(response)
+    self.assertEqual(mock_stderr.getvalue(), "bad �\n")
+
+  @mock.patch("sys.stderr", new_callable=io.StringIO)
+  def test_raise_for_status_ok(self, mock_stderr):
+    response = mock.Mock(status_code=200)
+    http_errors.raise_for_status(response)
+    response.raise_for_status.assert_called_once()
+    self.assertEqual(mock_stderr.getvalue(), "")
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,123 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Helper function to send HTTP requests with retries and backoff.
+
+Requests that fail with a transient error (HTTP status code 429 or 5xx) are
+retried with exponential backoff and jitter, or after the delay that the server
+specifies in the "Retry-After" (or "X-RateLimit-Reset") header. When the server
+responds with 429, all the threads that send requests to that host pause until
+the delay is over, so concurrent callers don't keep hitting the quota. Requests
+are not otherwise rate limited on the client side.
+"""
+
+import random
+import threading
+import time
+import urllib.parse
+from typing import Any, Dict, Optional
+
+from google.auth.transport import requests
+
+DEFAULT_MAX_ATTEMPTS = 6
+DEFAULT_BASE_SECONDS = 1.0
+MAX_SLEEP_SECONDS = 60.0
+
+RETRYABLE_STATUS_CODES = frozenset((429, 500, 502, 503, 504))
+
+# "X-RateLimit-Reset" values above this (in 2001) are Unix timestamps, rather
+# than a number of seconds from now.
+_MIN_EPOCH_SECONDS = 1e9
+
+# Earliest time (in time.monotonic() seconds) when the next request may be
+# sent to each host, after the server throttled it.
+_host_not_before: Dict[str, float] = {}
+_host_lock = threading.Lock()
+
+
+def _retry_after_seconds(
+    response: requests.requests.Response) -> Optional[float]:
+  """Returns the server-advertised delay before retrying, if there is one."""
+  for header in ("Retry-After", "X-RateLimit-Reset"):
+    value = response.headers.get(header)
+    if value is None:
+      continue
+    try:
+      seconds = float(value)
+    except ValueError:
+      continue  # E.g. an HTTP date, which we don't bother parsing.
+    if header == "X-RateLimit-Reset" and seconds > _MIN_EPOCH_SECONDS:
+      seconds -= time.time()
+    return max(0.0, seconds)
+  return None
+
+
+def _wait_for_host(host: str):
+  """Sleeps until the given host is no longer throttled."""
+  with _host_lock:
+    not_before = _host_not_before.get(host, 0.0)
+  delay = not_before - time.monotonic()
+  if delay > 0:
+    time.sleep(delay)
+
+
+def _throttle_host(host: str, seconds: float):
+  """Delays all the subsequent requests to the given host."""
+  not_before = time.monotonic() + seconds
+  with _host_lock:
+    _host_not_before[host] = max(_host_not_before.get(host, 0.0), not_before)
+
+
+def request_with_retry(http_session: requests.AuthorizedSession,
+                       method: str,
+                       url: str,
+                       max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                       base_seconds: float = DEFAULT_BASE_SECONDS,
+                       **kwargs: Any) -> requests.requests.Response:
+  """Sends an HTTP request, and retries it in case of transient errors.
+
+  Args:
+    http_session: Authorized session for HTTP requests.
+    method: HTTP method, e.g. "GET".
+    url: URL of the request.
+    max_attempts: Maximum number of attempts, including the first one
+      (default = 6).
+    base_seconds: Backoff duration before the first retry, doubled for each
+      subsequent retry (default = 1 second).
+    **kwargs: Passed as-is to http_session.request().
+
+  Returns:
+    The HTTP response of the last attempt. It is the caller's responsibility to
+    check its status code, because retries may be exhausted.
+  """
+  host = urllib.parse.urlsplit(url).netloc
+  attempt = 0
+  while True:
+    _wait_for_host(host)
+    response = http_session.request(method, url, **kwargs)
+    attempt += 1
+    if (response.status_code not in RETRYABLE_STATUS_CODES or
+        attempt >= max_attempts):
+      return response
+    # Release the connection, in case the response body wasn't read.
+    response.close()
+
+    delay = _retry_after_seconds(response)
+    if delay is None:
+      delay = base_seconds * 2**(attempt - 1) + random.uniform(0, base_seconds)
+    delay = min(delay, MAX_SLEEP_SECONDS)
+    if response.status_code == 429:
+      _throttle_host(host, delay)
+    else:
+      time.sleep(delay)
@@ -0,0 +1,116 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Tests for the "http_retry" module."""
+
+import unittest
+from unittest import mock
+
+from google.auth.transport import requests
+
+from . import http_retry
+
+URL = "https://backstory.googleapis.com/v1/ioc/listiocs"
+
+
+def _response(status_code, headers=None):
+  response = mock.Mock()
+  response.status_code = status_code
+  response.headers = headers or {}
+  return response
+
+
+class HttpRetryTest(unittest.TestCase):
+
+  def setUp(self):
+    super().setUp()
+    self.addCleanup(http_retry._host_not_before.clear)
+
+  @mock.patch("time.sleep", return_value=None)
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_no_retry_on_success(self, mock_session, mock_sleep):
+    mock_session.request.return_value = _response(200)
+    response = http_retry.request_with_retry(
+        mock_session, "GET", URL, params={"a": 1})
+    self.assertEqual(response.status_code, 200)
+    mock_session.request.assert_called_once_with("GET", URL, params={"a": 1})
+    mock_sleep.assert_not_called()
+
+  @mock.patch("time.sleep", return_value=None)
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_no_retry_on_client_error(self, mock_session, mock_sleep):
+    mock_session.request.return_value = _response(400)
+    response = http_retry.request_with_retry(mock_session, "GET", URL)
+    self.assertEqual(response.status_code, 400)
+    self.assertEqual(mock_session.request.call_count, 1)
+    mock_sleep.assert_not_called()
+
+  @mock.patch("time.sleep", return_value=None)
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_retry_on_server_error(self, mock_session, mock_sleep):
+    mock_session.request.side_effect = [
+        _response(503), _response(500), _response(200)
+    ]
+    response = http_retry.request_with_retry(mock_session, "GET", URL)
+    self.assertEqual(response.status_code, 200)
+    self.assertEqual(mock_session.request.call_count, 3)
+    # Exponential backoff: 1-2 seconds, then 2-3 seconds.
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+    self.assertEqual(len(delays), 2)
+    self.assertTrue(1 <= delays[0] <= 2)
+    self.assertTrue(2 <= delays[1] <= 3)
+
+  @mock.patch("time.sleep", return_value=None)
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_retry_after(self, mock_session, mock_sleep):
+    mock_session.request.side_effect = [
+        _response(429, {"Retry-After": "7"}),
+        _response(200)
+    ]
+    response = http_retry.request_with_retry(mock_session, "GET", URL)
+    self.assertEqual(response.status_code, 200)
+    mock_sleep.assert_called_once()
+    self.assertAlmostEqual(mock_sleep.call_args.args[0], 7, places=1)
+
+  @mock.patch("time.time", return_value=1700000000.0)
+  @mock.patch("time.sleep", return_value=None)
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_rate_limit_reset(self, mock_session, mock_sleep, unused_mock_time):
+    for reset, expected in (("5", 5), ("1700000003", 3), ("1600000000", 0)):
+      http_retry._host_not_before.clear()
+      mock_sleep.reset_mock()
+      mock_session.request.side_effect = [
+          _response(429, {"X-RateLimit-Reset": reset}),
+          _response(200)
+      ]
+      response = http_retry.request_with_retry(mock_session, "GET", URL)
+      self.assertEqual(response.status_code, 200)
+      if expected:
+        self.assertAlmostEqual(mock_sleep.call_args.args[0], expected, places=1)
+      else:
+        mock_sleep.assert_not_called()
+
+  @mock.patch("time.sleep", return_value=None)
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_max_attempts(self, mock_session, mock_sleep):
+    mock_session.request.return_value = _response(503)
+    response = http_retry.request_with_retry(
+        mock_session, "GET", URL, max_attempts=3)
+    self.assertEqual(response.status_code, 503)
+    self.assertEqual(mock_session.request.call_count, 3)
+    self.assertEqual(mock_sleep.call_count, 2)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -28,7 +28,7 @@ class CreateRuleTest(unittest.TestCase):
   @mock.patch.object(requests.requests, "Response", autospec=True)
   def test_http_error(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(return_value=400)
+    mock_response.status_code = 400
     mock_response.raise_for_status.side_effect = (
         requests.requests.exceptions.HTTPError())
 
@@ -39,7 +39,7 @@ class CreateRuleTest(unittest.TestCase):
   @mock.patch.object(requests.requests, "Response", autospec=True)
   def test_happy_path(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(return_value=200)
+    mock_response.status_code = 200
     expected_rule = {
         "ruleId": "ru_12345678-1234-1234-1234-1234567890ab",
         "rule": "rule content",
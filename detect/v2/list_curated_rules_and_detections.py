@@ -62,14 +62,18 @@ def list_curated_rules_and_detections(
     requests.exceptions.HTTPError: HTTP request resulted in an error
       (response.status_code >= 400).
   """
-  # Keep retrieving curated rules until there are no more.
+  # Keep retrieving curated rules until there are no more. Also stop after
+  # two consecutive empty pages, in case the server keeps returning a stale
+  # page token.
   page_token = ""
   all_curated_rules = []
+  empty_streak = 0
   while True:
     curated_rules, page_token = list_curated_rules.list_curated_rules(
         http_session, page_token=page_token)
     all_curated_rules.append(curated_rules)
-    if not page_token:
+    empty_streak = 0 if curated_rules else empty_streak + 1
+    if not page_token or empty_streak >= 2:
       break
 
   all_detections_and_tokens = []
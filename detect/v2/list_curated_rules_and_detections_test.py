@@ -101,6 +101,20 @@ class ListCuratedRulesAndDetectionsTest(unittest.TestCase):
     # ListCuratedRuleDetections.
     self.assertEqual(mock_sleep.call_count, 1)
 
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  @mock.patch.object(requests.requests, "Response", autospec=True)
+  def test_stale_page_token(self, mock_response, mock_session):
+    # list_curated_rules keeps returning empty pages with a page token.
+    type(mock_response).status_code = mock.PropertyMock(return_value=200)
+    mock_response.json.return_value = {"nextPageToken": "stale token"}
+    mock_session.request.return_value = mock_response
+
+    responses = list_curated_rules_and_detections.list_curated_rules_and_detections(
+        mock_session)
+    self.assertEqual(responses, [])
+    # The loop gives up after two consecutive empty pages.
+    self.assertEqual(mock_session.request.call_count, 2)
+
   @mock.patch.object(requests, "AuthorizedSession", autospec=True)
   @mock.patch.object(requests.requests, "Response", autospec=True)
   def test_list_curated_rules_error(self, mock_response, mock_session):
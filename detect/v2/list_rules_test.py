@@ -28,7 +28,7 @@ class ListRulesTest(unittest.TestCase):
   @mock.patch.object(requests.requests, "Response", autospec=True)
   def test_http_error(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(return_value=400)
+    mock_response.status_code = 400
     mock_response.raise_for_status.side_effect = (
         requests.requests.exceptions.HTTPError())
 
@@ -37,9 +37,9 @@ class ListRulesTest(unittest.TestCase):
 
   @mock.patch.object(requests, "AuthorizedSession", autospec=True)
   @mock.patch.object(requests.requests, "Response", autospec=True)
-  def test_happy_path_without_page_size(self, mock_response, mock_session):
+  def test_happy_path(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(return_value=200)
+    mock_response.status_code = 200
     expected_rule = {
         "ruleId": "ru_12345678-1234-1234-1234-1234567890ab",
         "rule": "rule content",
@@ -54,10 +54,15 @@ class ListRulesTest(unittest.TestCase):
         "nextPageToken": expected_page_token,
     }
 
-    rules, next_page_token = list_rules.list_rules(mock_session)
-    self.assertEqual(len(rules), 1)
-    self.assertEqual(rules[0], expected_rule)
-    self.assertEqual(next_page_token, expected_page_token)
+    # Without and with a page size, sharing the same mocks.
+    for page_size, expected_params in ((0, {}), (1, {"page_size": 1})):
+      mock_session.request.reset_mock()
+      rules, next_page_token = list_rules.list_rules(mock_session, page_size)
+      self.assertEqual(len(rules), 1)
+      self.assertEqual(rules[0], expected_rule)
+      self.assertEqual(next_page_token, expected_page_token)
+      self.assertEqual(mock_session.request.call_args.kwargs["params"],
+                       expected_params)
 
 
 if __name__ == "__main__":
@@ -23,8 +23,9 @@ workflow.
 import argparse
 import datetime
 import json
-import time
-from typing import Any, Mapping, Sequence, Tuple
+import signal
+import threading
+from typing import Any, Mapping, Optional, Sequence, Tuple
 
 from google.auth.transport import requests
 
@@ -43,7 +44,6 @@ DEFAULT_SLEEP_SECONDS = 5
 # Timeout used to wait until retrohunt is complete.
 DEFAULT_TIMEOUT_MINUTES = 1440.0  # 1 day = 60 * 24 = 1440 minutes.
 
-
 def get_retrohunt_info(
     retrohunt: Mapping[str, Any]) -> Tuple[str, str, str, float]:
   """Helper function to extract versionId, retrohuntId, state, and progressPercentage from retrohunt.
@@ -63,14 +63,19 @@ def run_retrohunt_and_wait(
     version_id: str,
     start_time: datetime.datetime,
     end_time: datetime.datetime,
-    sleep_seconds: int = DEFAULT_SLEEP_SECONDS,
+    sleep_seconds: float = DEFAULT_SLEEP_SECONDS,
     timeout_minutes: float = DEFAULT_TIMEOUT_MINUTES,
-    page_size: int = 0
+    page_size: int = 0,
+    cancel_event: Optional[threading.Event] = None
     ) -> Tuple[Sequence[Mapping[str, Any]], str]:
   """Runs a retrohunt and wait, and receive detections.
 
   When retrohunt does not complete within the 'timeout_minutes' time period,
-  it cancels the retrohunt and returns TimeoutError.
+  it cancels the retrohunt and returns TimeoutError. Setting the cancellation
+  event wakes up the wait immediately, cancels the retrohunt (if it's still
+  running) and raises KeyboardInterrupt. When called from the main thread,
+  Ctrl-C (SIGINT) sets this event while waiting, and the previous SIGINT handler
+  is restored afterwards.
 
   Args:
     http_session: Authorized session for HTTP requests.
@@ -80,12 +85,15 @@ def run_retrohunt_and_wait(
     start_time: The start time of the time range the retrohunt will process.
     end_time: The end time of the time range the retrohunt will process.
     sleep_seconds: Optional interval between retrohunt status checks, until it's
-      DONE or CANCELLED.
+      DONE or CANCELLED. Fractions of a second are supported.
     timeout_minutes: Optional timeout in minutes. This is used to wait for the
       retrohunt to complete.
     page_size: Maximum number of detections in the response. Must be
       non-negative. This is optional. If not provided, default value 100 is
       applied.
+    cancel_event: Optional event to cancel the wait from another thread. It
+      isn't cleared by this function. If not provided, a new event is used,
+      so concurrent calls don't cancel each other.
 
   Returns:
     First page of detections and page token, which is a Base64 token for
@@ -96,7 +104,16 @@ def run_retrohunt_and_wait(
     requests.exceptions.HTTPError: HTTP request resulted in an error
       (response.status_code >= 400).
     TimeoutError: When retrohunt does not complete by timeout.
+    KeyboardInterrupt: When the wait is cancelled before the retrohunt is
+      complete.
   """
+  if cancel_event is None:
+    cancel_event = threading.Event()
+
+  def on_sigint(signum, frame):
+    """Handles Ctrl-C while waiting for the retrohunt, by waking up the wait."""
+    cancel_event.set()
+
   deadline = datetime.datetime.now() + datetime.timedelta(
       minutes=timeout_minutes)
   # Start RunRetrohunt by calling RunRetrohunt.
@@ -105,17 +122,35 @@ def run_retrohunt_and_wait(
   version_id, retrohunt_id, state, progress_percentage = get_retrohunt_info(
       retrohunt_rep)
   print(f"Retrohunt started. retrohunt_id: {retrohunt_id}")
-  now = datetime.datetime.now()
-  while now < deadline and state not in ("DONE", "CANCELLED"):
-    print((f"Waiting for retrohunt to complete. Retrohunt is running at "
-           f"{progress_percentage}% .."))
-    time.sleep(sleep_seconds)
-    retrohunt_rep = get_retrohunt.get_retrohunt(http_session,
-                                                version_id,
-                                                retrohunt_id)
-    version_id, retrohunt_id, state, progress_percentage = get_retrohunt_info(
-        retrohunt_rep)
+  # Signal handlers can only be installed in the main thread.
+  previous_handler = None
+  if threading.current_thread() is threading.main_thread():
+    previous_handler = signal.signal(signal.SIGINT, on_sigint)
+  try:
     now = datetime.datetime.now()
+    while now < deadline and state not in ("DONE", "CANCELLED"):
+      print((f"Waiting for retrohunt to complete. Retrohunt is running at "
+             f"{progress_percentage}% .."))
+      if cancel_event.wait(sleep_seconds):
+        break
+      retrohunt_rep = get_retrohunt.get_retrohunt(http_session,
+                                                  version_id,
+                                                  retrohunt_id)
+      version_id, retrohunt_id, state, progress_percentage = (
+          get_retrohunt_info(retrohunt_rep))
+      now = datetime.datetime.now()
+  finally:
+    if previous_handler is not None:
+      signal.signal(signal.SIGINT, previous_handler)
+
+  # Ctrl-C may have been pressed at any point while waiting, including during
+  # the last GetRetrohunt call, so check it regardless of the retrohunt state.
+  if cancel_event.is_set():
+    if state not in ("DONE", "CANCELLED"):
+      print(f"Cancelling retrohunt for versionID: {version_id}")
+      cancel_retrohunt.cancel_retrohunt(http_session, version_id,
+                                        retrohunt_id)
+    raise KeyboardInterrupt("Retrohunt cancelled while waiting.")
 
   # We finished waiting for the retrohunt to complete. We cancel the retrohunt
   # if it is still running.
@@ -162,7 +197,7 @@ if __name__ == "__main__":
   parser.add_argument(
       "-ss",
       "--sleep_seconds",
-      type=int,
+      type=float,
       default=DEFAULT_SLEEP_SECONDS,
       help="interval between retrohunt status polls in seconds (default = 5)")
   parser.add_argument(
@@ -15,6 +15,8 @@
 """Unit tests for the "run_retrohunt_and_wait" module."""
 
 import datetime
+import signal
+import threading
 import unittest
 from unittest import mock
 
@@ -22,42 +24,42 @@ from google.auth.transport import requests
 
 from . import run_retrohunt_and_wait as wait
 
+# The retrohunt time range is only passed through to the (mocked) API, so it
+# doesn't need to be relative to the current time.
+_END_TIME = datetime.datetime(2024, 1, 1, 12, 0, 0)
+_START_TIME = _END_TIME - datetime.timedelta(hours=1)
+
+_RULE_ID = "ru_bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb"
+_VERSION_ID = f"{_RULE_ID}@v_123456789_12345789"
+
+# Response for RunRetrohunt, shared by the tests (which must not modify it).
+_RUNNING_RETROHUNT = {
+    "retrohuntId": "oh_aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
+    "ruleId": _RULE_ID,
+    "versionId": _VERSION_ID,
+    "eventStartTime": "2021-01-01T00:00:00Z",
+    "eventEndTime": "2021-01-02T00:00:00Z",
+    "retrohuntStartTime": "2020-01-01T00:00:00Z",
+    "retrohuntEndTime": "2020-01-02T00:00:00Z",
+    "state": "RUNNING",
+    "progressPercentage": "0.0",
+}
+
+# Response for GetRetrohunt, after the retrohunt is complete.
+_COMPLETED_RETROHUNT = dict(
+    _RUNNING_RETROHUNT, state="DONE", progressPercentage="100.0")
+
 
 class RunRetrohuntAndWaitTest(unittest.TestCase):
 
-  @mock.patch("time.sleep", return_value=None)
+  @mock.patch.object(threading.Event, "wait", return_value=False)
   @mock.patch.object(requests, "AuthorizedSession", autospec=True)
   @mock.patch.object(requests.requests, "Response", autospec=True)
   def test_happy_path(self, mock_response, mock_session, mock_sleep):
     # run retrohunt, wait retrohunt, list detections, all success.
-    type(mock_response).status_code = mock.PropertyMock(
-        side_effect=[200, 200, 200])
-    mock_response.raise_for_status.side_effect = [None, None, None]
-    rule_id = "ru_bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb"
-    version_id = f"{rule_id}@v_123456789_12345789"
-    # Response for RunRetrohunt
-    running_rh = {
-        "retrohuntId":
-            "oh_aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
-        "ruleId": rule_id,
-        "versionId": version_id,
-        "eventStartTime":
-            "2021-01-01T00:00:00Z",
-        "eventEndTime":
-            "2021-01-02T00:00:00Z",
-        "retrohuntStartTime":
-            "2020-01-01T00:00:00Z",
-        "retrohuntEndTime":
-            "2020-01-02T00:00:00Z",
-        "state":
-            "RUNNING",
-        "progressPercentage":
-            "0.0",
-    }
-    # Response for GetRetrohunt
-    completed_rh = running_rh.copy()
-    completed_rh["state"] = "DONE"
-    completed_rh["progressPercentage"] = "100.0"
+    mock_response.status_code = 200
+    mock_response.raise_for_status.side_effect = (None,) * 3
+    rule_id, version_id = _RULE_ID, _VERSION_ID
 
     # Response for ListDetections
     expected_detection = {
@@ -87,16 +89,15 @@ class RunRetrohuntAndWaitTest(unittest.TestCase):
         ],
     }
     expected_page_token = "page token"
-    mock_response.json.side_effect = [
-        running_rh, completed_rh, {
+    mock_response.json.side_effect = (
+        _RUNNING_RETROHUNT, _COMPLETED_RETROHUNT, {
             "detections": [expected_detection],
             "nextPageToken": expected_page_token,
-        }
-    ]
+        })
     mock_session.request.return_value = mock_response
 
-    end_time = datetime.datetime.now()
-    start_time = end_time - datetime.timedelta(hours=1)
+    end_time = _END_TIME
+    start_time = _START_TIME
 
     got_detections, next_page_token = wait.run_retrohunt_and_wait(
         mock_session, rule_id, start_time, end_time)
@@ -110,29 +111,9 @@ class RunRetrohuntAndWaitTest(unittest.TestCase):
   @mock.patch.object(requests.requests, "Response", autospec=True)
   def test_retrohunt_not_complete(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(
-        side_effect=[200, 200, 200, 200])
-    rule_id = "ru_bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb"
-    version_id = f"{rule_id}@v_123456789_12345789"
-    # Response for RunRetrohunt.
-    running_rh = {
-        "retrohuntId":
-            "oh_aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
-        "ruleId": rule_id,
-        "versionId": version_id,
-        "eventStartTime":
-            "2021-01-01T00:00:00Z",
-        "eventEndTime":
-            "2021-01-02T00:00:00Z",
-        "retrohuntStartTime":
-            "2020-01-01T00:00:00Z",
-        "retrohuntEndTime":
-            "2020-01-02T00:00:00Z",
-        "state":
-            "RUNNING",
-        "progressPercentage":
-            "0.0",
-    }
+    mock_response.status_code = 200
+    rule_id = _RULE_ID
+    running_rh = _RUNNING_RETROHUNT
 
     # We'll call run_retrohunt_and_wait with sleep_secounds=2,
     # timeout_minutes 0.05(=3sec). With this setup, we make 2 GetRetrohunt calls
@@ -156,8 +137,8 @@ class RunRetrohuntAndWaitTest(unittest.TestCase):
     ]
     mock_response.raise_for_status.side_effect = ([None, None, None, None])
 
-    end_time = datetime.datetime.now()
-    start_time = end_time - datetime.timedelta(hours=1)
+    end_time = _END_TIME
+    start_time = _START_TIME
 
     with self.assertRaises(TimeoutError):
       wait.run_retrohunt_and_wait(
@@ -170,32 +151,107 @@ class RunRetrohuntAndWaitTest(unittest.TestCase):
 
   @mock.patch.object(requests, "AuthorizedSession", autospec=True)
   @mock.patch.object(requests.requests, "Response", autospec=True)
-  def test_wait_retrohunt_timeout_cancel_retrohunt_error(
-      self, mock_response, mock_session):
+  def test_wait_interrupted(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(
-        side_effect=[200, 200, 400])
-    rule_id = "ru_bbbbbbbb-bbbb-bbbb-bbbb-bbbbbbbbbbbb"
-    version_id = f"{rule_id}@v_123456789_12345789"
-    # Response for RunRetrohunt.
+    mock_response.status_code = 200
+    rule_id, version_id = _RULE_ID, _VERSION_ID
+    # Response for RunRetrohunt, then an empty response for CancelRetrohunt.
     running_rh = {
-        "retrohuntId":
-            "oh_aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
+        "retrohuntId": "oh_aaaaaaaa-aaaa-aaaa-aaaa-aaaaaaaaaaaa",
         "ruleId": rule_id,
         "versionId": version_id,
-        "eventStartTime":
-            "2021-01-01T00:00:00Z",
-        "eventEndTime":
-            "2021-01-02T00:00:00Z",
-        "retrohuntStartTime":
-            "2020-01-01T00:00:00Z",
-        "retrohuntEndTime":
-            "2020-01-02T00:00:00Z",
-        "state":
-            "RUNNING",
-        "progressPercentage":
-            "0.0",
+        "state": "RUNNING",
+        "progressPercentage": "0.0",
     }
+    mock_response.json.side_effect = [running_rh, None]
+    mock_response.raise_for_status.side_effect = [None, None]
+
+    end_time = _END_TIME
+    start_time = _START_TIME
+
+    # Simulate a SIGINT arriving during the first wait, by calling the
+    # handler that is installed while waiting.
+    def sigint_during_wait(timeout):
+      signal.getsignal(signal.SIGINT)(signal.SIGINT, None)
+      return True
+
+    previous_handler = signal.getsignal(signal.SIGINT)
+    with mock.patch.object(
+        threading.Event, "wait", side_effect=sigint_during_wait):
+      with self.assertRaises(KeyboardInterrupt):
+        wait.run_retrohunt_and_wait(
+            mock_session, rule_id, start_time, end_time, sleep_seconds=0.5)
+    # RunRetrohunt and CancelRetrohunt, but no GetRetrohunt.
+    self.assertEqual(mock_session.request.call_count, 2)
+    self.assertTrue(
+        mock_session.request.call_args[0][1].endswith(":cancelRetrohunt"))
+    self.assertIs(signal.getsignal(signal.SIGINT), previous_handler)
+
+  @mock.patch.object(threading.Event, "wait", return_value=False)
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  @mock.patch.object(requests.requests, "Response", autospec=True)
+  def test_interrupted_during_get_retrohunt(self, mock_response, mock_session,
+                                            mock_sleep):
+    mock_session.request.return_value = mock_response
+    mock_response.status_code = 200
+
+    # Simulate a SIGINT arriving during the GetRetrohunt call, which then
+    # reports that the retrohunt is complete.
+    def json_side_effect():
+      if mock_response.json.call_count == 2:
+        signal.getsignal(signal.SIGINT)(signal.SIGINT, None)
+        return _COMPLETED_RETROHUNT
+      return _RUNNING_RETROHUNT
+
+    mock_response.json.side_effect = json_side_effect
+    previous_handler = signal.getsignal(signal.SIGINT)
+    with self.assertRaises(KeyboardInterrupt):
+      wait.run_retrohunt_and_wait(mock_session, _RULE_ID, _START_TIME,
+                                  _END_TIME)
+    # RunRetrohunt and GetRetrohunt, but neither CancelRetrohunt (the
+    # retrohunt is already complete) nor ListDetections.
+    self.assertEqual(mock_session.request.call_count, 2)
+    self.assertEqual(mock_sleep.call_count, 1)
+    self.assertIs(signal.getsignal(signal.SIGINT), previous_handler)
+
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  @mock.patch.object(requests.requests, "Response", autospec=True)
+  def test_cancel_event(self, mock_response, mock_session):
+    mock_session.request.return_value = mock_response
+    mock_response.status_code = 200
+    # Response for RunRetrohunt, then an empty response for CancelRetrohunt.
+    mock_response.json.side_effect = [_RUNNING_RETROHUNT, None]
+    cancel_event = threading.Event()
+
+    # Simulate another thread cancelling the first wait.
+    def cancel_during_wait(timeout):
+      cancel_event.set()
+      return True
+
+    with mock.patch.object(
+        cancel_event, "wait", side_effect=cancel_during_wait):
+      with self.assertRaises(KeyboardInterrupt):
+        wait.run_retrohunt_and_wait(
+            mock_session,
+            _RULE_ID,
+            _START_TIME,
+            _END_TIME,
+            cancel_event=cancel_event)
+    # RunRetrohunt and CancelRetrohunt, but no GetRetrohunt.
+    self.assertEqual(mock_session.request.call_count, 2)
+    self.assertTrue(
+        mock_session.request.call_args[0][1].endswith(":cancelRetrohunt"))
+    self.assertTrue(cancel_event.is_set())
+
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  @mock.patch.object(requests.requests, "Response", autospec=True)
+  def test_wait_retrohunt_timeout_cancel_retrohunt_error(
+      self, mock_response, mock_session):
+    mock_session.request.return_value = mock_response
+    type(mock_response).status_code = mock.PropertyMock(
+        side_effect=[200, 200, 400])
+    rule_id = _RULE_ID
+    running_rh = _RUNNING_RETROHUNT
     # Response for GetRetrohunt.
     running_rh2 = running_rh.copy()
     running_rh2["progressPercentage"] = "10.0"
@@ -209,8 +265,8 @@ class RunRetrohuntAndWaitTest(unittest.TestCase):
          None,
          requests.requests.exceptions.HTTPError()])
 
-    end_time = datetime.datetime.now()
-    start_time = end_time - datetime.timedelta(hours=1)
+    end_time = _END_TIME
+    start_time = _START_TIME
 
     with self.assertRaises(requests.requests.exceptions.HTTPError):
       wait.run_retrohunt_and_wait(
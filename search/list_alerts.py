@@ -21,6 +21,7 @@ https://cloud.google.com/chronicle/docs/reference/search-api#listalerts
 """
 
 import argparse
+from concurrent import futures
 import datetime
 import json
 import sys
@@ -34,10 +35,11 @@ from common import regions
 
 CHRONICLE_API_BASE_URL = "https://backstory.googleapis.com"
 
+_PARSER: Optional[argparse.ArgumentParser] = None
 
-def initialize_command_line_args(
-    args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
-  """Initializes and checks all the command-line arguments."""
+
+def _build_parser() -> argparse.ArgumentParser:
+  """Builds the command-line argument parser."""
   parser = argparse.ArgumentParser()
   chronicle_auth.add_argument_credentials_file(parser)
   regions.add_argument_region(parser)
@@ -67,9 +69,18 @@ def initialize_command_line_args(
       default=100000,
       help=("Maximum number of alerts to return, up to 100,000" +
             "(default = 100,000)"))
+  return parser
+
+
+def initialize_command_line_args(
+    args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
+  """Initializes and checks all the command-line arguments."""
+  global _PARSER
+  if _PARSER is None:
+    _PARSER = _build_parser()
 
   # Sanity checks for the command-line arguments.
-  parsed_args = parser.parse_args(args)
+  parsed_args = _PARSER.parse_args(args)
   s, e, ps = parsed_args.start_time, parsed_args.end_time, parsed_args.page_size
   if parsed_args.local_time:
     s = s.replace(tzinfo=None).astimezone(datetime.timezone.utc)
@@ -173,6 +184,67 @@ def list_alerts(
   return response.json()
 
 
+def list_alerts_sweep(
+    http_session: requests.AuthorizedSession,
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    window: datetime.timedelta = datetime.timedelta(hours=1),
+    concurrency: int = 8,
+    page_size: Optional[int] = 100000) -> Mapping[str, Sequence[Any]]:
+  """Lists alerts in a long time range, by splitting it into smaller windows.
+
+  Each window is an independent "list_alerts" call, so up to "concurrency"
+  calls are sent in parallel over the same HTTP session (the default
+  connection pool of a requests session holds 10 connections per host). The
+  per-call limit of 100,000 alerts applies to each window separately.
+
+  Args:
+    http_session: Authorized session for HTTP requests.
+    start_time: The inclusive beginning of the time range of alerts to return,
+      with any timezone (even a timezone-unaware datetime object, i.e. local
+      time).
+    end_time: The exclusive end of the time range of alerts to return, with any
+      timezone (even a timezone-unaware datetime object, i.e. local time).
+    window: Duration of each time window (default = 1 hour).
+    concurrency: Maximum number of concurrent requests (default = 8).
+    page_size: Maximum number of alerts to return per window, up to 100,000
+      (default = 100,000).
+
+  Returns:
+    Same structure as "list_alerts": each asset or user appears once, with the
+    alert infos of all the windows concatenated in chronological window order.
+
+  Raises:
+    ValueError: The window is zero or negative.
+    requests.exceptions.HTTPError: HTTP request resulted in an error
+    (response.status_code >= 400).
+  """
+  if window <= datetime.timedelta(0):
+    raise ValueError(f"window must be positive, not {window}")
+
+  windows = []
+  t = start_time
+  while t < end_time:
+    windows.append((t, min(t + window, end_time)))
+    t += window
+
+  with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+    results = executor.map(
+        lambda w: list_alerts(http_session, w[0], w[1], page_size), windows)
+    merged = {}
+    # Merged asset and user alerts, by their list and asset or user.
+    by_subject = {}
+    for result in results:
+      for key, subject in (("alerts", "asset"), ("userAlerts", "user")):
+        for alert in result.get(key, []):
+          k = (key, json.dumps(alert.get(subject), sort_keys=True))
+          if k not in by_subject:
+            by_subject[k] = dict(alert, alertInfos=[])
+            merged.setdefault(key, []).append(by_subject[k])
+          by_subject[k]["alertInfos"].extend(alert.get("alertInfos", []))
+  return merged
+
+
 if __name__ == "__main__":
   cli = initialize_command_line_args()
   if not cli:
@@ -183,5 +255,5 @@ if __name__ == "__main__":
     start, end = start.replace(tzinfo=None), end.replace(tzinfo=None)
 
   CHRONICLE_API_BASE_URL = regions.url(CHRONICLE_API_BASE_URL, cli.region)
-  session = chronicle_auth.initialize_http_session(cli.credentials_file)
+  session = chronicle_auth.get_cached_http_session(cli.credentials_file)
   print(json.dumps(list_alerts(session, start, end, size), indent=2))
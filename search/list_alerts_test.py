@@ -22,6 +22,8 @@ from google.auth.transport import requests
 
 from . import list_alerts
 
+_UTC = datetime.timezone.utc
+
 
 class ListAlertsTest(unittest.TestCase):
 
@@ -38,7 +40,7 @@ class ListAlertsTest(unittest.TestCase):
     self.assertIsNotNone(actual)
 
   def test_initialize_command_line_args_future_start(self):
-    start_time = datetime.datetime.utcnow().astimezone(datetime.timezone.utc)
+    start_time = datetime.datetime.now(_UTC)
     start_time += datetime.timedelta(days=2)
     end_time = start_time + datetime.timedelta(days=1)
     actual = list_alerts.initialize_command_line_args([
@@ -48,7 +50,7 @@ class ListAlertsTest(unittest.TestCase):
     self.assertIsNone(actual)
 
   def test_initialize_command_line_args_future_end(self):
-    start_time = datetime.datetime.utcnow().astimezone(datetime.timezone.utc)
+    start_time = datetime.datetime.now(_UTC)
     start_time -= datetime.timedelta(days=2)
     end_time = start_time + datetime.timedelta(days=4)
     actual = list_alerts.initialize_command_line_args([
@@ -58,7 +60,7 @@ class ListAlertsTest(unittest.TestCase):
     self.assertIsNone(actual)
 
   def test_initialize_command_line_args_empty_range(self):
-    start_time = datetime.datetime.utcnow().astimezone(datetime.timezone.utc)
+    start_time = datetime.datetime.now(_UTC)
     start_time -= datetime.timedelta(days=2)
     actual = list_alerts.initialize_command_line_args([
         start_time.strftime("-ts=%Y-%m-%dT%H:%M:%SZ"),
@@ -67,7 +69,7 @@ class ListAlertsTest(unittest.TestCase):
     self.assertIsNone(actual)
 
   def test_initialize_command_line_args_negative_range(self):
-    start_time = datetime.datetime.utcnow().astimezone(datetime.timezone.utc)
+    start_time = datetime.datetime.now(_UTC)
     start_time -= datetime.timedelta(days=2)
     end_time = start_time - datetime.timedelta(days=4)
     actual = list_alerts.initialize_command_line_args([
@@ -108,6 +110,60 @@ class ListAlertsTest(unittest.TestCase):
                                      datetime.datetime(2021, 5, 8, 11, 22, 33))
     self.assertEqual(actual, {"mock": "json"})
 
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_list_alerts_sweep(self, mock_session):
+
+    def request(method, url, params):
+      # Asset "a" has an alert in every window, asset "b" only in the last one.
+      hour = params["start_time"][11:13]
+      alerts = [{"asset": {"hostname": "a"}, "alertInfos": [{"name": hour}]}]
+      if hour == "13":
+        alerts.append({
+            "asset": {"hostname": "b"},
+            "alertInfos": [{"name": "x"}]
+        })
+      response = mock.Mock(status_code=200)
+      response.json.return_value = {
+          "alerts": alerts,
+          "userAlerts": [{
+              "user": {"email": "c"},
+              "alertInfos": [{"name": hour}]
+          }],
+      }
+      return response
+
+    mock_session.request.side_effect = request
+    actual = list_alerts.list_alerts_sweep(
+        mock_session,
+        datetime.datetime(2021, 5, 7, 11, 0, 0, tzinfo=_UTC),
+        datetime.datetime(2021, 5, 7, 13, 30, 0, tzinfo=_UTC),
+        concurrency=2)
+    # 3 windows: 11:00-12:00, 12:00-13:00, 13:00-13:30.
+    self.assertEqual(mock_session.request.call_count, 3)
+    self.assertEqual(actual, {
+        "alerts": [
+            {
+                "asset": {"hostname": "a"},
+                "alertInfos": [{"name": "11"}, {"name": "12"}, {"name": "13"}]
+            },
+            {"asset": {"hostname": "b"}, "alertInfos": [{"name": "x"}]},
+        ],
+        "userAlerts": [{
+            "user": {"email": "c"},
+            "alertInfos": [{"name": "11"}, {"name": "12"}, {"name": "13"}]
+        }],
+    })
+
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_list_alerts_sweep_invalid_window(self, mock_session):
+    for window in (datetime.timedelta(0), datetime.timedelta(hours=-1)):
+      with self.assertRaises(ValueError):
+        list_alerts.list_alerts_sweep(mock_session,
+                                      datetime.datetime(2021, 5, 7, 11, 0, 0),
+                                      datetime.datetime(2021, 5, 7, 13, 30, 0),
+                                      window)
+    mock_session.request.assert_not_called()
+
 
 if __name__ == "__main__":
   unittest.main()
@@ -26,23 +26,37 @@ https://cloud.google.com/chronicle/docs/reference/udm-field-list
 """
 
 import argparse
+from concurrent import futures
 import datetime
-import json
 import sys
-from typing import Any, Mapping, Optional, Sequence, Tuple
+from typing import Any, Iterator, List, Mapping, Optional, Sequence, Tuple
 
 from google.auth.transport import requests
 
 from common import chronicle_auth
 from common import datetime_converter
+from common import fast_json
+from common import http_errors
+from common import http_retry
 from common import regions
 
 CHRONICLE_API_BASE_URL = "https://backstory.googleapis.com"
 
+_UTC = datetime.timezone.utc
 
-def initialize_command_line_args(
-    args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
-  """Initializes and checks all the command-line arguments."""
+# Command-line argument names of asset indicators, and their API equivalents.
+ASSET_INDICATORS = (
+    ("hostname", "hostname"),
+    ("ip_address", "asset_ip_address"),
+    ("mac_address", "mac_address"),
+    ("product_id", "product_id"),
+)
+
+_PARSER: Optional[argparse.ArgumentParser] = None
+
+
+def _build_parser() -> argparse.ArgumentParser:
+  """Builds the command-line argument parser."""
   parser = argparse.ArgumentParser()
   chronicle_auth.add_argument_credentials_file(parser)
   regions.add_argument_region(parser)
@@ -91,25 +105,40 @@ def initialize_command_line_args(
       type=int,
       required=False,
       help="maximum number of events to return (1-10,000, default = maximum)")
+  return parser
+
+
+def initialize_command_line_args(
+    args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
+  """Initializes and checks all the command-line arguments.
+
+  Times in the returned arguments are always timezone-aware and in UTC, even
+  if they were specified in the system's local timezone.
+  """
+  global _PARSER
+  if _PARSER is None:
+    _PARSER = _build_parser()
 
   # Sanity checks for the command-line arguments.
-  parsed_args = parser.parse_args(args)
+  parsed_args = _PARSER.parse_args(args)
 
-  asset_indicators = (parsed_args.hostname, parsed_args.ip_address,
-                      parsed_args.mac_address, parsed_args.product_id)
+  asset_indicators = [getattr(parsed_args, arg) for arg, _ in ASSET_INDICATORS]
   if sum([1 for i in asset_indicators if i is not None]) != 1:
     print("Error: specify exactly one asset indicator")
     return None
 
   s, e, r = parsed_args.start_time, parsed_args.end_time, parsed_args.ref_time
   if parsed_args.local_time:
-    s = s.replace(tzinfo=None).astimezone(datetime.timezone.utc)
-    e = e.replace(tzinfo=None).astimezone(datetime.timezone.utc)
-    r = r.replace(tzinfo=None).astimezone(datetime.timezone.utc)
-  if s > datetime.datetime.utcnow().astimezone(datetime.timezone.utc):
+    s = s.replace(tzinfo=None).astimezone(_UTC)
+    e = e.replace(tzinfo=None).astimezone(_UTC)
+    r = r.replace(tzinfo=None).astimezone(_UTC)
+    parsed_args.start_time, parsed_args.end_time = s, e
+    parsed_args.ref_time = r
+  now = datetime.datetime.now(_UTC)
+  if s > now:
     print("Error: start time should not be in the future")
     return None
-  if r > datetime.datetime.utcnow().astimezone(datetime.timezone.utc):
+  if r > now:
     print("Error: reference time should not be in the future")
     return None
   if s >= e:
@@ -124,6 +153,43 @@ def initialize_command_line_args(
   return parsed_args
 
 
+def _list_events_url(base_url: Optional[str] = None) -> str:
+  """Returns the URL of the ListEvents endpoint under the given base URL."""
+  return f"{base_url or CHRONICLE_API_BASE_URL}/v1/asset/listevents"
+
+
+def _request_asset_events(
+    http_session: requests.AuthorizedSession,
+    indicator: str,
+    asset: str,
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    ref_time: datetime.datetime,
+    page_size: Optional[int],
+    stream: bool = False,
+    url: Optional[str] = None) -> requests.requests.Response:
+  """Sends a ListEvents request, and checks the status of its response."""
+  url = url or _list_events_url()
+  params = {
+      "asset." + indicator: asset,
+      "start_time": datetime_converter.strftime(start_time),
+      "end_time": datetime_converter.strftime(end_time),
+      "reference_time": datetime_converter.strftime(ref_time),
+      "page_size": page_size,
+  }
+  # Up to 10,000 UDM events compress very well.
+  response = http_retry.request_with_retry(
+      http_session,
+      "GET",
+      url,
+      params=params,
+      headers={"Accept-Encoding": "gzip"},
+      stream=stream)
+
+  http_errors.raise_for_status(response)
+  return response
+
+
 def list_asset_events(
     http_session: requests.AuthorizedSession,
     indicator: str,
@@ -131,8 +197,9 @@ def list_asset_events(
     start_time: datetime.datetime,
     end_time: datetime.datetime,
     ref_time: datetime.datetime,
-    page_size: Optional[int] = 0
-) -> Tuple[Sequence[Mapping[str, Any]], str, bool]:
+    page_size: Optional[int] = 0,
+    url: Optional[str] = None
+) -> Tuple[Sequence[Mapping[str, Any]], bool, str]:
   """Lists up to 10,000 UDM events that reference an asset in a time range.
 
   If there are more matching events than what was returned (according to the
@@ -140,6 +207,10 @@ def list_asset_events(
   call into multiple shorter time ranges to ensure you have visibility into all
   the available events.
 
+  To look up many assets in the same time range, use "list_asset_events_many"
+  instead of calling this function in a loop. To process a large page of events
+  without holding all of them in memory, use "stream_asset_events".
+
   Args:
     http_session: Authorized session for HTTP requests.
     indicator: Type of asset indicator - either "hostname", "asset_ip_address",
@@ -155,6 +226,8 @@ def list_asset_events(
       (even a timezone-unaware datetime object, i.e. local time).
     page_size: Maximum number of events to return, up to 10,000 (default =
       10,000).
+    url: Full URL of the ListEvents endpoint (default = the one under
+      CHRONICLE_API_BASE_URL, i.e. in the US unless it was changed).
 
   Returns:
     Tuple with 3 elements: (1) a list of all the UDM events (within the defined
@@ -167,49 +240,205 @@ def list_asset_events(
     requests.exceptions.HTTPError: HTTP request resulted in an error
     (response.status_code >= 400).
   """
-  url = f"{CHRONICLE_API_BASE_URL}/v1/asset/listevents"
-  params = {
-      "asset." + indicator: asset,
-      "start_time": datetime_converter.strftime(start_time),
-      "end_time": datetime_converter.strftime(end_time),
-      "reference_time": datetime_converter.strftime(ref_time),
-      "page_size": page_size,
-  }
-  response = http_session.request("GET", url, params=params)
+  response = _request_asset_events(
+      http_session,
+      indicator,
+      asset,
+      start_time,
+      end_time,
+      ref_time,
+      page_size,
+      url=url)
+  d = fast_json.loads(response.content)
+  events = d.get("events") or []
+  is_more = d.get("moreDataAvailable", False)
+  uri = d.get("uri") or [""]
+  return events, is_more, uri[0]
+
+
+def stream_asset_events(
+    http_session: requests.AuthorizedSession,
+    indicator: str,
+    asset: str,
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    ref_time: datetime.datetime,
+    page_size: Optional[int] = 0) -> Iterator[Mapping[str, Any]]:
+  """Yields the UDM events of a single "list_asset_events" call, one by one.
 
-  if response.status_code >= 400:
-    print(response.text)
-  response.raise_for_status()
-  d = response.json()
-  return d.get("events", []), d.get("moreDataAvailable", False), d["uri"][0]
+  The response is streamed, and parsed incrementally if the optional "ijson"
+  library is installed (see "fast_json.iter_items"), so the events are yielded
+  as they arrive, and only one of them at a time is held in memory. Without
+  "ijson", the whole response is parsed before the first event is yielded.
 
+  Unlike "list_asset_events", this function doesn't report whether more events
+  are available, or the Chronicle web UI URL. If the number of yielded events
+  equals the page size, there may be more matching events in the time range.
 
-if __name__ == "__main__":
-  cli = initialize_command_line_args()
+  Args:
+    http_session: Authorized session for HTTP requests.
+    indicator: Same as in "list_asset_events".
+    asset: Same as in "list_asset_events".
+    start_time: Same as in "list_asset_events".
+    end_time: Same as in "list_asset_events".
+    ref_time: Same as in "list_asset_events".
+    page_size: Same as in "list_asset_events".
+
+  Yields:
+    UDM events as Python dictionaries, in the same order as in the response.
+
+  Raises:
+    requests.exceptions.HTTPError: HTTP request resulted in an error
+    (response.status_code >= 400).
+  """
+  with _request_asset_events(
+      http_session,
+      indicator,
+      asset,
+      start_time,
+      end_time,
+      ref_time,
+      page_size,
+      stream=True) as response:
+    response.raw.decode_content = True
+    yield from fast_json.iter_items(response.raw, "events")
+
+
+def iter_asset_events(
+    http_session: requests.AuthorizedSession,
+    indicator: str,
+    asset: str,
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    ref_time: datetime.datetime,
+    page_size: Optional[int] = 0) -> Iterator[Mapping[str, Any]]:
+  """Yields all the UDM events that reference an asset in a time range.
+
+  Unlike "list_asset_events", this isn't limited to a single page. Whenever the
+  server reports that more events are available in a time range, that range is
+  split in half, and each half is listed separately (over the same HTTP
+  session), as recommended in the documentation of "list_asset_events". This
+  doesn't depend on the order of the events in each response.
+
+  The page of a split range is discarded, so this issues up to twice as many
+  calls as there are pages. Time ranges are sent with a resolution of one
+  second, so a range that can't be split any further (i.e. more events than the
+  page size within a single second) yields only one page of its events, and
+  writes a warning to stderr.
+
+  Args:
+    http_session: Authorized session for HTTP requests.
+    indicator: Same as in "list_asset_events".
+    asset: Same as in "list_asset_events".
+    start_time: Same as in "list_asset_events".
+    end_time: Same as in "list_asset_events".
+    ref_time: Same as in "list_asset_events".
+    page_size: Maximum number of events to return per call, up to 10,000
+      (default = 10,000).
+
+  Yields:
+    UDM events as Python dictionaries, one at a time, in chronological order of
+    the time ranges that contain them.
+
+  Raises:
+    requests.exceptions.HTTPError: HTTP request resulted in an error
+    (response.status_code >= 400).
+  """
+  one_second = datetime.timedelta(seconds=1)
+  # Time ranges that are yet to be listed, the earliest one at the end.
+  ranges = [(start_time.astimezone(_UTC).replace(microsecond=0),
+             end_time.astimezone(_UTC).replace(microsecond=0))]
+  while ranges:
+    start, end = ranges.pop()
+    events, is_more, _ = list_asset_events(http_session, indicator, asset,
+                                           start, end, ref_time, page_size)
+    if is_more and end - start >= 2 * one_second:
+      middle = (start + (end - start) / 2).replace(microsecond=0)
+      ranges.append((middle, end))
+      ranges.append((start, middle))
+      continue
+    if is_more:
+      sys.stderr.write(f"Warning: more events than the page size between "
+                       f"{datetime_converter.strftime(start)} and "
+                       f"{datetime_converter.strftime(end)}\n")
+    yield from events
+
+
+def list_asset_events_many(
+    http_session: requests.AuthorizedSession,
+    indicator: str,
+    assets: Sequence[str],
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    ref_time: datetime.datetime,
+    page_size: Optional[int] = 0,
+    concurrency: int = 8
+) -> List[Tuple[Sequence[Mapping[str, Any]], bool, str]]:
+  """Lists UDM events for many assets of the same type, concurrently.
+
+  Each asset is an independent "list_asset_events" call, so up to
+  "concurrency" calls are sent in parallel over the same HTTP session, which
+  overlaps their network latency. Use chronicle_auth.get_cached_http_session()
+  to get a session whose connection pool is large enough for this. Requests are
+  sent over HTTP/1.1, so each in-flight request uses its own pooled keep-alive
+  connection, and "concurrency" should not exceed the pool size.
+
+  Args:
+    http_session: Authorized session for HTTP requests.
+    indicator: Type of asset indicator - same as in "list_asset_events".
+    assets: Asset indicator values, e.g. a list of hostnames.
+    start_time: Same as in "list_asset_events".
+    end_time: Same as in "list_asset_events".
+    ref_time: Same as in "list_asset_events".
+    page_size: Same as in "list_asset_events".
+    concurrency: Maximum number of concurrent requests (default = 8).
+
+  Returns:
+    List of "list_asset_events" results, in the same order as the assets.
+
+  Raises:
+    requests.exceptions.HTTPError: HTTP request resulted in an error
+    (response.status_code >= 400).
+  """
+  with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+    return list(
+        executor.map(
+            lambda asset: list_asset_events(http_session, indicator, asset,
+                                            start_time, end_time, ref_time,
+                                            page_size), assets))
+
+
+def list_asset_events_cli(argv: Optional[Sequence[str]] = None) -> int:
+  """Command-line entry point, separate from the reusable functions above.
+
+  Programmatic callers should call "list_asset_events" (or its batch variants)
+  directly with datetime objects, rather than format and re-parse ISO 8601
+  strings through this function.
+
+  Args:
+    argv: Command-line arguments (default = sys.argv[1:]).
+
+  Returns:
+    Process exit code.
+  """
+  cli = initialize_command_line_args(argv)
   if not cli:
-    sys.exit(1)  # A sanity check failed.
-
-  start, end, ref = cli.start_time, cli.end_time, cli.ref_time
-  if cli.local_time:
-    start = start.replace(tzinfo=None)
-    end = end.replace(tzinfo=None)
-    ref = ref.replace(tzinfo=None)
-
-  CHRONICLE_API_BASE_URL = regions.url(CHRONICLE_API_BASE_URL, cli.region)
-  session = chronicle_auth.initialize_http_session(cli.credentials_file)
-  common_args = (start, end, ref, cli.page_size)
-  if cli.hostname:
-    events, is_more, web_url = list_asset_events(session, "hostname",
-                                                 cli.hostname, *common_args)
-  elif cli.ip_address:
-    events, is_more, web_url = list_asset_events(session, "asset_ip_address",
-                                                 cli.ip_address, *common_args)
-  elif cli.mac_address:
-    events, is_more, web_url = list_asset_events(session, "mac_address",
-                                                 cli.mac_address, *common_args)
-  else:
-    events, is_more, web_url = list_asset_events(session, "product_id",
-                                                 cli.product_id, *common_args)
-  print(json.dumps(events, indent=2))
+    return 1  # A sanity check failed.
+
+  # Don't modify CHRONICLE_API_BASE_URL, because this may be called many times.
+  url = _list_events_url(regions.url(CHRONICLE_API_BASE_URL, cli.region))
+  session = chronicle_auth.get_cached_http_session(cli.credentials_file)
+  common_args = (cli.start_time, cli.end_time, cli.ref_time, cli.page_size)
+  arg, indicator = next((arg, indicator)
+                        for arg, indicator in ASSET_INDICATORS
+                        if getattr(cli, arg) is not None)
+  events, is_more, web_url = list_asset_events(
+      session, indicator, getattr(cli, arg), *common_args, url=url)
+  fast_json.dump_list(events, sys.stdout)
   print(f"\nMore events? {is_more}")
   print(f"\nChronicle asset view URL: {web_url}")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(list_asset_events_cli())
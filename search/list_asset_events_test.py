@@ -15,6 +15,8 @@
 """Tests for the "list_asset_events" module."""
 
 import datetime
+import io
+import json
 import unittest
 from unittest import mock
 
@@ -22,6 +24,8 @@ from google.auth.transport import requests
 
 from . import list_asset_events
 
+_UTC = datetime.timezone.utc
+
 
 class ListAssetEventsTest(unittest.TestCase):
 
@@ -35,6 +39,18 @@ class ListAssetEventsTest(unittest.TestCase):
     ])
     self.assertIsNotNone(actual)
 
+  def test_initialize_command_line_args_local_time_to_utc(self):
+    actual = list_asset_events.initialize_command_line_args([
+        "--hostname=foobar",
+        "--start_time=2021-10-04T00:00:00",
+        "--end_time=2021-10-05T00:00:00",
+        "--ref_time=2021-10-04T12:00:00",
+        "--local_time",
+    ])
+    local = datetime.datetime(2021, 10, 4, 12, 0, 0).astimezone()
+    self.assertEqual(actual.ref_time, local)
+    self.assertEqual(actual.ref_time.tzinfo, datetime.timezone.utc)
+
   def test_initialize_command_line_args_ip_utc(self):
     actual = list_asset_events.initialize_command_line_args([
         "--ip_address=127.0.0.1",
@@ -45,7 +61,7 @@ class ListAssetEventsTest(unittest.TestCase):
     self.assertIsNotNone(actual)
 
   def test_initialize_command_line_args_zero_asset_indicators(self):
-    end_time = datetime.datetime.utcnow().astimezone(datetime.timezone.utc)
+    end_time = datetime.datetime.now(_UTC)
     ref_time = end_time - datetime.timedelta(days=1)
     start_time = ref_time - datetime.timedelta(days=1)
     actual = list_asset_events.initialize_command_line_args([
@@ -56,7 +72,7 @@ class ListAssetEventsTest(unittest.TestCase):
     self.assertIsNone(actual)
 
   def test_initialize_command_line_args_two_asset_indicators(self):
-    end_time = datetime.datetime.utcnow().astimezone(datetime.timezone.utc)
+    end_time = datetime.datetime.now(_UTC)
     ref_time = end_time - datetime.timedelta(days=1)
     start_time = ref_time - datetime.timedelta(days=1)
     actual = list_asset_events.initialize_command_line_args([
@@ -69,7 +85,7 @@ class ListAssetEventsTest(unittest.TestCase):
     self.assertIsNone(actual)
 
   def test_initialize_command_line_args_future_start_time(self):
-    ref_time = datetime.datetime.utcnow().astimezone(datetime.timezone.utc)
+    ref_time = datetime.datetime.now(_UTC)
     start_time = ref_time + datetime.timedelta(hours=1)
     end_time = start_time + datetime.timedelta(hours=1)
     actual = list_asset_events.initialize_command_line_args([
@@ -81,7 +97,7 @@ class ListAssetEventsTest(unittest.TestCase):
     self.assertIsNone(actual)
 
   def test_initialize_command_line_args_future_reference_time(self):
-    start_time = datetime.datetime.utcnow().astimezone(datetime.timezone.utc)
+    start_time = datetime.datetime.now(_UTC)
     start_time -= datetime.timedelta(hours=1)
     ref_time = start_time + datetime.timedelta(hours=2)
     end_time = ref_time + datetime.timedelta(hours=1)
@@ -94,7 +110,7 @@ class ListAssetEventsTest(unittest.TestCase):
     self.assertIsNone(actual)
 
   def test_initialize_command_line_args_empty_time_range(self):
-    start_time = datetime.datetime.utcnow().astimezone(datetime.timezone.utc)
+    start_time = datetime.datetime.now(_UTC)
     start_time -= datetime.timedelta(days=2)
     actual = list_asset_events.initialize_command_line_args([
         "-m=172.168.0.1",
@@ -105,7 +121,7 @@ class ListAssetEventsTest(unittest.TestCase):
     self.assertIsNone(actual)
 
   def test_initialize_command_line_args_negative_time_range(self):
-    start_time = datetime.datetime.utcnow().astimezone(datetime.timezone.utc)
+    start_time = datetime.datetime.now(_UTC)
     start_time -= datetime.timedelta(days=2)
     ref_time = start_time - datetime.timedelta(days=2)
     end_time = ref_time - datetime.timedelta(days=2)
@@ -127,12 +143,44 @@ class ListAssetEventsTest(unittest.TestCase):
     ])
     self.assertIsNone(actual)
 
+  def test_list_asset_events_cli_sanity_check(self):
+    actual = list_asset_events.list_asset_events_cli([
+        "--start_time=2021-10-04T00:00:00Z",
+        "--end_time=2021-10-05T00:00:00Z",
+        "--ref_time=2021-10-04T12:00:00Z",
+    ])
+    self.assertEqual(actual, 1)
+
+  @mock.patch("sys.stdout", new_callable=io.StringIO)
+  @mock.patch.object(list_asset_events.chronicle_auth,
+                     "get_cached_http_session")
+  def test_list_asset_events_cli_region(self, mock_get_session,
+                                        unused_mock_stdout):
+    mock_session = mock_get_session.return_value
+    mock_session.request.return_value = mock.Mock(
+        status_code=200, content=b'{"uri": [""]}')
+    args = [
+        "--region=europe",
+        "--hostname=foo",
+        "--start_time=2021-10-04T00:00:00Z",
+        "--end_time=2021-10-05T00:00:00Z",
+        "--ref_time=2021-10-04T12:00:00Z",
+    ]
+    # Repeated calls use the same regional URL.
+    for _ in range(2):
+      self.assertEqual(list_asset_events.list_asset_events_cli(args), 0)
+      self.assertEqual(
+          mock_session.request.call_args.args[1],
+          "https://europe-backstory.googleapis.com/v1/asset/listevents")
+    self.assertEqual(list_asset_events.CHRONICLE_API_BASE_URL,
+                     "https://backstory.googleapis.com")
+
   @mock.patch.object(requests, "AuthorizedSession", autospec=True)
   @mock.patch.object(requests.requests, "Response", autospec=True)
   def test_list_asset_events(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
     type(mock_response).status_code = mock.PropertyMock(return_value=200)
-    mock_response.json.return_value = {"uri": ["http://foo.com"]}
+    mock_response.content = b'{"uri": ["http://foo.com"]}'
     actual = list_asset_events.list_asset_events(
         mock_session, "product_id", "CS:12345",
         datetime.datetime(2021, 5, 7, 11, 22, 33),
@@ -140,11 +188,101 @@ class ListAssetEventsTest(unittest.TestCase):
         datetime.datetime(2021, 5, 8, 11, 22, 33))
     self.assertEqual(actual, ([], False, "http://foo.com"))
 
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_list_asset_events_without_uri(self, mock_session):
+    mock_session.request.return_value = mock.Mock(
+        status_code=200, content=b'{"moreDataAvailable": true}')
+    actual = list_asset_events.list_asset_events(
+        mock_session, "product_id", "CS:12345",
+        datetime.datetime(2021, 5, 7, 11, 22, 33),
+        datetime.datetime(2021, 5, 9, 11, 22, 33),
+        datetime.datetime(2021, 5, 8, 11, 22, 33))
+    self.assertEqual(actual, ([], True, ""))
+
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_stream_asset_events(self, mock_session):
+    events = [{"metadata": {"id": "a"}}, {"metadata": {"id": "b"}}]
+    raw = io.BytesIO(json.dumps({"events": events, "uri": [""]}).encode())
+    mock_response = mock.MagicMock(status_code=200, raw=raw)
+    mock_response.__enter__.return_value = mock_response
+    mock_session.request.return_value = mock_response
+    actual = list_asset_events.stream_asset_events(
+        mock_session, "hostname", "foo",
+        datetime.datetime(2021, 5, 7, 11, 22, 33),
+        datetime.datetime(2021, 5, 9, 11, 22, 33),
+        datetime.datetime(2021, 5, 8, 11, 22, 33))
+    self.assertEqual(list(actual), events)
+    self.assertTrue(mock_session.request.call_args.kwargs["stream"])
+    mock_response.__exit__.assert_called_once()
+
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_iter_asset_events(self, mock_session):
+    # The full range (12:00-14:00) and its first half (12:00-13:00) have more
+    # events than the page size, so they are split until they don't.
+    pages = {
+        ("2021-05-07T12:00:00Z", "2021-05-07T14:00:00Z"): (["x"], True),
+        ("2021-05-07T12:00:00Z", "2021-05-07T13:00:00Z"): (["y"], True),
+        ("2021-05-07T12:00:00Z", "2021-05-07T12:30:00Z"): (["a", "b"], False),
+        ("2021-05-07T12:30:00Z", "2021-05-07T13:00:00Z"): (["c"], False),
+        ("2021-05-07T13:00:00Z", "2021-05-07T14:00:00Z"): (["d"], False),
+    }
+
+    def request(method, url, params, **kwargs):
+      events, is_more = pages[(params["start_time"], params["end_time"])]
+      return mock.Mock(
+          status_code=200,
+          content=json.dumps({
+              "events": events,
+              "moreDataAvailable": is_more,
+              "uri": [""]
+          }).encode())
+
+    mock_session.request.side_effect = request
+    actual = list(
+        list_asset_events.iter_asset_events(
+            mock_session, "hostname", "foo",
+            datetime.datetime(2021, 5, 7, 12, tzinfo=_UTC),
+            datetime.datetime(2021, 5, 7, 14, tzinfo=_UTC),
+            datetime.datetime(2021, 5, 7, 12, tzinfo=_UTC)))
+    self.assertEqual(actual, ["a", "b", "c", "d"])
+    self.assertEqual(mock_session.request.call_count, 5)
+
+  @mock.patch("sys.stderr", new_callable=io.StringIO)
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_iter_asset_events_unsplittable(self, mock_session, mock_stderr):
+    mock_session.request.return_value = mock.Mock(
+        status_code=200,
+        content=b'{"events": ["a"], "moreDataAvailable": true, "uri": [""]}')
+    actual = list(
+        list_asset_events.iter_asset_events(
+            mock_session, "hostname", "foo",
+            datetime.datetime(2021, 5, 7, 12, 0, 0, tzinfo=_UTC),
+            datetime.datetime(2021, 5, 7, 12, 0, 1, tzinfo=_UTC),
+            datetime.datetime(2021, 5, 7, 12, tzinfo=_UTC)))
+    self.assertEqual(actual, ["a"])
+    self.assertEqual(mock_session.request.call_count, 1)
+    self.assertIn("Warning", mock_stderr.getvalue())
+
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_list_asset_events_many(self, mock_session):
+    mock_session.request.return_value = mock.Mock(
+        status_code=200, content=b'{"uri": ["http://foo.com"]}')
+    actual = list_asset_events.list_asset_events_many(
+        mock_session, "hostname", ["foo", "bar", "baz"],
+        datetime.datetime(2021, 5, 7, 11, 22, 33),
+        datetime.datetime(2021, 5, 9, 11, 22, 33),
+        datetime.datetime(2021, 5, 8, 11, 22, 33))
+    self.assertEqual(actual, [([], False, "http://foo.com")] * 3)
+    hostnames = sorted(c.kwargs["params"]["asset.hostname"]
+                       for c in mock_session.request.call_args_list)
+    self.assertEqual(hostnames, ["bar", "baz", "foo"])
+
   @mock.patch.object(requests, "AuthorizedSession", autospec=True)
   @mock.patch.object(requests.requests, "Response", autospec=True)
   def test_http_error(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
     type(mock_response).status_code = mock.PropertyMock(return_value=400)
+    mock_response.content = b"error details"
     mock_response.raise_for_status.side_effect = (
         requests.requests.exceptions.HTTPError())
 
@@ -22,22 +22,28 @@ https://cloud.google.com/chronicle/docs/reference/search-api#listiocs
 
 import argparse
 import datetime
-import json
 import sys
+import urllib.parse
 from typing import Any, Mapping, Optional, Sequence
 
 from google.auth.transport import requests
 
 from common import chronicle_auth
 from common import datetime_converter
+from common import fast_json
+from common import http_errors
+from common import http_retry
 from common import regions
 
 CHRONICLE_API_BASE_URL = "https://backstory.googleapis.com"
 
+_UTC = datetime.timezone.utc
 
-def initialize_command_line_args(
-    args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
-  """Initializes and checks all the command-line arguments."""
+_PARSER: Optional[argparse.ArgumentParser] = None
+
+
+def _build_parser() -> argparse.ArgumentParser:
+  """Builds the command-line argument parser."""
   parser = argparse.ArgumentParser()
   chronicle_auth.add_argument_credentials_file(parser)
   regions.add_argument_region(parser)
@@ -60,13 +66,27 @@ def initialize_command_line_args(
       default=10000,
       help=("Maximum number of IoCs to return, up to 10,000" +
             "(default = 10,000)"))
+  return parser
+
+
+def initialize_command_line_args(
+    args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
+  """Initializes and checks all the command-line arguments.
+
+  The start time in the returned arguments is always timezone-aware and in
+  UTC, even if it was specified in the system's local timezone.
+  """
+  global _PARSER
+  if _PARSER is None:
+    _PARSER = _build_parser()
 
   # Sanity checks for the command-line arguments.
-  parsed_args = parser.parse_args(args)
+  parsed_args = _PARSER.parse_args(args)
   s, ps = parsed_args.start_time, parsed_args.page_size
   if parsed_args.local_time:
-    s = s.replace(tzinfo=None).astimezone(datetime.timezone.utc)
-  if s > datetime.datetime.now().astimezone(datetime.timezone.utc):
+    s = s.replace(tzinfo=None).astimezone(_UTC)
+    parsed_args.start_time = s
+  if s > datetime.datetime.now(_UTC):
     print("Error: start time should not be in the future")
     return None
   if ps > 10000 or ps < 1:
@@ -130,15 +150,50 @@ def list_iocs(http_session: requests.AuthorizedSession,
     requests.exceptions.HTTPError: HTTP request resulted in an error
     (response.status_code >= 400).
   """
-  url = f"{CHRONICLE_API_BASE_URL}/v1/ioc/listiocs"
-  s = datetime_converter.strftime(start_time)
-  params = {"start_time": s, "page_size": page_size}
-  response = http_session.request("GET", url, params=params)
+  return list_iocs_prepared(http_session, list_iocs_url(start_time, page_size))
+
+
+def list_iocs_url(start_time: datetime.datetime,
+                  page_size: Optional[int] = 10000) -> str:
+  """Returns the URL for "list_iocs_prepared", including its query string.
 
-  if response.status_code >= 400:
-    print(response.text)
-  response.raise_for_status()
-  return response.json()
+  Args:
+    start_time: Same as in "list_iocs".
+    page_size: Same as in "list_iocs".
+
+  Returns:
+    Full URL of a ListIoCs request, with URL-encoded parameters.
+  """
+  query = urllib.parse.urlencode({
+      "start_time": datetime_converter.strftime(start_time),
+      "page_size": page_size
+  })
+  return f"{CHRONICLE_API_BASE_URL}/v1/ioc/listiocs?{query}"
+
+
+def list_iocs_prepared(http_session: requests.AuthorizedSession,
+                       prepared_url: str) -> Mapping[str, Any]:
+  """Same as "list_iocs", with a URL that was built by "list_iocs_url".
+
+  Callers that send the same request repeatedly (e.g. polling for new IoCs)
+  can build the URL once and skip re-encoding its parameters on every call.
+
+  Args:
+    http_session: Authorized session for HTTP requests.
+    prepared_url: Full URL returned by "list_iocs_url".
+
+  Returns:
+    Same as "list_iocs".
+
+  Raises:
+    requests.exceptions.HTTPError: HTTP request resulted in an error
+    (response.status_code >= 400).
+  """
+  response = http_retry.request_with_retry(
+      http_session, "GET", prepared_url, headers={"Accept-Encoding": "gzip"})
+
+  http_errors.raise_for_status(response)
+  return fast_json.loads(response.content)
 
 
 if __name__ == "__main__":
@@ -146,10 +201,6 @@ if __name__ == "__main__":
   if not cli:
     sys.exit(1)  # A sanity check failed.
 
-  start, size = cli.start_time, cli.page_size
-  if cli.local_time:
-    start = start.replace(tzinfo=None)
-
   CHRONICLE_API_BASE_URL = regions.url(CHRONICLE_API_BASE_URL, cli.region)
-  session = chronicle_auth.initialize_http_session(cli.credentials_file)
-  print(json.dumps(list_iocs(session, start, size), indent=2))
+  session = chronicle_auth.get_cached_http_session(cli.credentials_file)
+  print(fast_json.dumps(list_iocs(session, cli.start_time, cli.page_size)))
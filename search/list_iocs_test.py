@@ -22,6 +22,8 @@ from google.auth.transport import requests
 
 from . import list_iocs
 
+_UTC = datetime.timezone.utc
+
 
 class ListIocsTest(unittest.TestCase):
 
@@ -51,7 +53,7 @@ class ListIocsTest(unittest.TestCase):
     self.assertIsNone(actual)
 
   def test_initialize_command_line_args_future(self):
-    start_time = datetime.datetime.utcnow().astimezone(datetime.timezone.utc)
+    start_time = datetime.datetime.now(_UTC)
     start_time += datetime.timedelta(days=2)
     actual = list_iocs.initialize_command_line_args(
         [start_time.strftime("-ts=%Y-%m-%dT%H:%M:%SZ")])
@@ -62,11 +64,19 @@ class ListIocsTest(unittest.TestCase):
   def test_list_iocs(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
     type(mock_response).status_code = mock.PropertyMock(return_value=200)
-    mock_response.json.return_value = {"mock": "json"}
+    mock_response.content = b'{"mock": "json"}'
     actual = list_iocs.list_iocs(mock_session,
                                  datetime.datetime(2021, 5, 7, 11, 22, 33))
     self.assertEqual(actual, {"mock": "json"})
 
+  def test_list_iocs_url(self):
+    actual = list_iocs.list_iocs_url(
+        datetime.datetime(2021, 5, 7, 11, 22, 33, tzinfo=datetime.timezone.utc),
+        page_size=100)
+    self.assertEqual(
+        actual, "https://backstory.googleapis.com/v1/ioc/listiocs" +
+        "?start_time=2021-05-07T11%3A22%3A33Z&page_size=100")
+
 
 if __name__ == "__main__":
   unittest.main()
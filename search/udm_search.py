@@ -21,23 +21,46 @@ https://cloud.google.com/chronicle/docs/reference/search-api#udmsearch
 """
 
 import argparse
+from concurrent import futures
 import datetime
-import json
 import sys
-from typing import Any, Mapping, Optional, Sequence
+from typing import Any, Iterator, List, Mapping, Optional, Sequence, Tuple
 
 from google.auth.transport import requests
 
 from common import chronicle_auth
 from common import datetime_converter
+from common import fast_json
+from common import http_errors
 from common import regions
 
 CHRONICLE_API_BASE_URL = "https://backstory.googleapis.com"
 
+_UTC = datetime.timezone.utc
 
-def initialize_command_line_args(
-    args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
-  """Initializes and checks all the command-line arguments."""
+_PARSER: Optional[argparse.ArgumentParser] = None
+
+# Connect and read timeouts (in seconds) of UDM Search requests, so a hung
+# connection doesn't hold on to a pooled connection forever.
+TIMEOUT = (5, 60)
+
+
+def _udm_url() -> str:
+  """Returns the URL of the UDM Search endpoint in the current region."""
+  return f"{CHRONICLE_API_BASE_URL}/v1/events:udmSearch"
+
+
+def _limit(value: str) -> int:
+  """Parses and checks the value of the "--limit" command-line argument."""
+  limit = int(value)
+  if not 1 <= limit <= 1000:
+    raise argparse.ArgumentTypeError(
+        "limit can not be more than 1,000 or less than 1")
+  return limit
+
+
+def _build_parser() -> argparse.ArgumentParser:
+  """Builds the command-line argument parser."""
   parser = argparse.ArgumentParser()
   chronicle_auth.add_argument_credentials_file(parser)
   regions.add_argument_region(parser)
@@ -64,28 +87,34 @@ def initialize_command_line_args(
   parser.add_argument(
       "-l",
       "--limit",
-      type=int,
+      type=_limit,
       default=1000,
       help=("Limit on the maximum number of matches to return, up to 1,000" +
             "(default = 1,000)"))
+  return parser
+
+
+def initialize_command_line_args(
+    args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
+  """Initializes and checks all the command-line arguments."""
+  global _PARSER
+  if _PARSER is None:
+    _PARSER = _build_parser()
 
   # Sanity checks for the command-line arguments.
-  parsed_args = parser.parse_args(args)
-  s, e, limit = parsed_args.start_time, parsed_args.end_time, parsed_args.limit
+  parsed_args = _PARSER.parse_args(args)
+  s, e = parsed_args.start_time, parsed_args.end_time
   if parsed_args.local_time:
-    s = s.replace(tzinfo=None).astimezone(datetime.timezone.utc)
-    e = e.replace(tzinfo=None).astimezone(datetime.timezone.utc)
-  if s > datetime.datetime.now().astimezone(datetime.timezone.utc):
-    print("Error: start time should not be in the future")
-    return None
-  if e > datetime.datetime.now().astimezone(datetime.timezone.utc):
-    print("Error: end time should not be in the future")
-    return None
-  if s >= e:
-    print("Error: start time should not be same as or later than end time")
-    return None
-  if limit > 1000 or limit < 1:
-    print("Error: limit can not be more than 1,000 or less than 1")
+    s = s.replace(tzinfo=None).astimezone(_UTC)
+    e = e.replace(tzinfo=None).astimezone(_UTC)
+  now = datetime.datetime.now(_UTC)
+  if not now >= e > s:
+    if s > now:
+      print("Error: start time should not be in the future")
+    elif e > now:
+      print("Error: end time should not be in the future")
+    else:
+      print("Error: start time should not be same as or later than end time")
     return None
 
   return parsed_args
@@ -95,11 +124,15 @@ def udm_search(http_session: requests.AuthorizedSession,
                query: str,
                start_time: datetime.datetime,
                end_time: datetime.datetime,
-               limit: Optional[int] = 1000) -> Mapping[str, Any]:
+               limit: Optional[int] = 1000,
+               url: Optional[str] = None) -> Mapping[str, Any]:
   """Performs a UDM search across the specified time range.
 
   Args:
-    http_session: Authorized session for HTTP requests.
+    http_session: Authorized session for HTTP requests. Callers that perform
+      multiple searches should reuse the same session (e.g. from
+      chronicle_auth.get_cached_http_session()) for all of them, so that they
+      share its keep-alive connections instead of opening new ones.
     query: UDM search query.
     start_time: Inclusive beginning of the time range to search, with any
       timezone (even a timezone-unaware datetime object, i.e. local time).
@@ -107,6 +140,9 @@ def udm_search(http_session: requests.AuthorizedSession,
       a timezone-unaware datetime object, i.e. local time).
     limit: Maximum number of matched events to return, up to 1,000 (default =
       1,000).
+    url: Full URL of the UDM Search endpoint (default = the one under
+      CHRONICLE_API_BASE_URL, i.e. in the region that was specified on the
+      command line, or in the US).
 
   Returns:
     {
@@ -135,21 +171,97 @@ def udm_search(http_session: requests.AuthorizedSession,
     requests.exceptions.HTTPError: HTTP request resulted in an error
     (response.status_code >= 400).
   """
-  url = f"{CHRONICLE_API_BASE_URL}/v1/events:udmSearch"
+  url = url or _udm_url()
   s = datetime_converter.strftime(start_time)
   e = datetime_converter.strftime(end_time)
-  params = {
-      "query": query,
-      "time_range.start_time": s,
-      "time_range.end_time": e,
-      "limit": limit
-  }
-  response = http_session.request("GET", url, params=params)
+  params = (("query", query), ("time_range.start_time", s),
+            ("time_range.end_time", e), ("limit", limit))
+  response = http_session.request("GET", url, params=params, timeout=TIMEOUT)
+
+  http_errors.raise_for_status(response)
+  return fast_json.loads(response.content)
+
+
+def udm_search_stream(
+    http_session: requests.AuthorizedSession,
+    query: str,
+    start_time: datetime.datetime,
+    end_time: datetime.datetime,
+    limit: Optional[int] = 1000,
+    url: Optional[str] = None) -> Iterator[Mapping[str, Any]]:
+  """Performs a UDM search, and yields the matched events one by one.
+
+  The response is streamed, and parsed incrementally if the optional "ijson"
+  library is installed (see "fast_json.iter_items"), so the events are yielded
+  as they arrive, and only one of them at a time is held in memory. Without
+  "ijson", the whole response is read and parsed before the first event is
+  yielded, which uses as much memory as "udm_search".
+
+  Args:
+    http_session: Authorized session for HTTP requests.
+    query: UDM search query.
+    start_time: Inclusive beginning of the time range to search, with any
+      timezone (even a timezone-unaware datetime object, i.e. local time).
+    end_time: Exclusive end of the time range to search, with any timezone (even
+      a timezone-unaware datetime object, i.e. local time).
+    limit: Maximum number of matched events to return, up to 1,000 (default =
+      1,000).
+    url: Same as in "udm_search".
+
+  Yields:
+    The matched events, with the same structure as the "events" list in the
+    result of "udm_search".
+
+  Raises:
+    requests.exceptions.HTTPError: HTTP request resulted in an error
+    (response.status_code >= 400).
+  """
+  url = url or _udm_url()
+  s = datetime_converter.strftime(start_time)
+  e = datetime_converter.strftime(end_time)
+  params = (("query", query), ("time_range.start_time", s),
+            ("time_range.end_time", e), ("limit", limit))
+  with http_session.request(
+      "GET", url, params=params, timeout=TIMEOUT, stream=True) as response:
+    http_errors.raise_for_status(response)
+    response.raw.decode_content = True
+    yield from fast_json.iter_items(response.raw, "events")
+
+
+def udm_search_many(
+    http_session: requests.AuthorizedSession,
+    queries_with_ranges: Sequence[Tuple[str, datetime.datetime,
+                                        datetime.datetime]],
+    limit: Optional[int] = 1000,
+    max_concurrency: int = 8) -> List[Mapping[str, Any]]:
+  """Performs multiple independent UDM searches concurrently.
+
+  Each search is a "udm_search" call, and up to "max_concurrency" of them are
+  sent in parallel over the same HTTP session, which overlaps their network
+  latency.
+
+  Args:
+    http_session: Authorized session for HTTP requests.
+    queries_with_ranges: (query, start_time, end_time) tuples, with the same
+      meaning as the corresponding arguments of "udm_search".
+    limit: Maximum number of matched events to return per search, up to 1,000
+      (default = 1,000).
+    max_concurrency: Maximum number of concurrent searches (default = 8).
+
+  Returns:
+    List of "udm_search" results, in the same order as the searches.
+
+  Raises:
+    requests.exceptions.HTTPError: HTTP request resulted in an error
+    (response.status_code >= 400).
+  """
+
+  def search(query_with_range):
+    query, start_time, end_time = query_with_range
+    return udm_search(http_session, query, start_time, end_time, limit)
 
-  if response.status_code >= 400:
-    print(response.text)
-  response.raise_for_status()
-  return response.json()
+  with futures.ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+    return list(executor.map(search, queries_with_ranges))
 
 
 if __name__ == "__main__":
@@ -162,5 +274,5 @@ if __name__ == "__main__":
     start = start.replace(tzinfo=None)
 
   CHRONICLE_API_BASE_URL = regions.url(CHRONICLE_API_BASE_URL, cli.region)
-  session = chronicle_auth.initialize_http_session(cli.credentials_file)
-  print(json.dumps(udm_search(session, q, start, end, l), indent=2))
+  session = chronicle_auth.get_cached_http_session(cli.credentials_file)
+  print(fast_json.dumps(udm_search(session, q, start, end, l)))
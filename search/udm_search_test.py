@@ -15,6 +15,8 @@
 """Tests for the "udm_search" module."""
 
 import datetime
+import io
+import json
 import unittest
 from unittest import mock
 
@@ -49,12 +51,14 @@ class UDMSearchTest(unittest.TestCase):
     self.assertIsNotNone(actual)
 
   def test_initialize_command_line_args_invalid_limit(self):
-    actual = udm_search.initialize_command_line_args([
-        "--query=metadata.event_type=\"NETWORK_CONNECTION\"",
-        "--start_time=2022-08-01T00:00:00", "--end_time=2022-08-01T01:00:00",
-        "--limit=100000"
-    ])
-    self.assertIsNone(actual)
+    for limit in ("0", "1001", "100000", "abc"):
+      with self.assertRaises(SystemExit) as error:
+        udm_search.initialize_command_line_args([
+            "--query=metadata.event_type=\"NETWORK_CONNECTION\"",
+            "--start_time=2022-08-01T00:00:00",
+            "--end_time=2022-08-01T01:00:00", f"--limit={limit}"
+        ])
+      self.assertEqual(error.exception.code, 2)
 
   def test_initialize_command_line_args_invalid_start_time(self):
     actual = udm_search.initialize_command_line_args([
@@ -70,16 +74,79 @@ class UDMSearchTest(unittest.TestCase):
     ])
     self.assertIsNone(actual)
 
+  def test_initialize_command_line_args_future_end_time(self):
+    actual = udm_search.initialize_command_line_args([
+        "--query=metadata.event_type=\"NETWORK_CONNECTION\"",
+        "--start_time=2022-08-01T00:00:00", "--end_time=2100-08-01T01:00:00"
+    ])
+    self.assertIsNone(actual)
+
   @mock.patch.object(requests, "AuthorizedSession", autospec=True)
   @mock.patch.object(requests.requests, "Response", autospec=True)
   def test_udm_search(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(return_value=200)
-    mock_response.json.return_value = {"mock": "json"}
+    mock_response.status_code = 200
+    mock_response.content = b'{"mock": "json"}'
     actual = udm_search.udm_search(mock_session, "principal.ip=\"10.1.2.3\"",
                                    datetime.datetime(2022, 8, 1, 00, 00, 00),
                                    datetime.datetime(2022, 8, 2, 0, 0, 0))
     self.assertEqual(actual, {"mock": "json"})
+    self.assertEqual(mock_session.request.call_args.args[1],
+                     "https://backstory.googleapis.com/v1/events:udmSearch")
+
+  @mock.patch.object(udm_search, "CHRONICLE_API_BASE_URL",
+                     "https://europe-backstory.googleapis.com")
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_udm_search_region(self, mock_session):
+    mock_session.request.return_value = mock.Mock(
+        status_code=200, content=b"{}")
+    udm_search.udm_search(mock_session, "principal.ip=\"10.1.2.3\"",
+                          datetime.datetime(2022, 8, 1, 0, 0, 0),
+                          datetime.datetime(2022, 8, 2, 0, 0, 0))
+    self.assertEqual(
+        mock_session.request.call_args.args[1],
+        "https://europe-backstory.googleapis.com/v1/events:udmSearch")
+
+  @mock.patch("sys.stderr", new_callable=io.StringIO)
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_udm_search_error(self, mock_session, mock_stderr):
+    mock_response = mock.Mock(status_code=400, content=b"x" * 10000)
+    mock_response.raise_for_status.side_effect = (
+        requests.requests.exceptions.HTTPError())
+    mock_session.request.return_value = mock_response
+    with self.assertRaises(requests.requests.exceptions.HTTPError):
+      udm_search.udm_search(mock_session, "principal.ip=\"10.1.2.3\"",
+                            datetime.datetime(2022, 8, 1, 0, 0, 0),
+                            datetime.datetime(2022, 8, 2, 0, 0, 0))
+    self.assertEqual(mock_stderr.getvalue(), "x" * 2048 + "\n")
+
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_udm_search_stream(self, mock_session):
+    events = [{"name": "a", "udm": {}}, {"name": "b", "udm": {}}]
+    raw = io.BytesIO(json.dumps({"events": events}).encode())
+    mock_response = mock.MagicMock(status_code=200, raw=raw)
+    mock_response.__enter__.return_value = mock_response
+    mock_session.request.return_value = mock_response
+    actual = udm_search.udm_search_stream(
+        mock_session, "principal.ip=\"10.1.2.3\"",
+        datetime.datetime(2022, 8, 1, 0, 0, 0),
+        datetime.datetime(2022, 8, 2, 0, 0, 0))
+    self.assertEqual(list(actual), events)
+    self.assertTrue(mock_session.request.call_args.kwargs["stream"])
+    mock_response.__exit__.assert_called_once()
+
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_udm_search_many(self, mock_session):
+    mock_session.request.side_effect = lambda *args, **kwargs: mock.Mock(
+        status_code=200,
+        content=json.dumps({"query": dict(kwargs["params"])["query"]}).encode())
+    start_time = datetime.datetime(2022, 8, 1, 0, 0, 0)
+    end_time = datetime.datetime(2022, 8, 2, 0, 0, 0)
+    queries = [f"principal.ip=\"10.1.2.{i}\"" for i in range(10)]
+    actual = udm_search.udm_search_many(
+        mock_session, [(q, start_time, end_time) for q in queries],
+        max_concurrency=3)
+    self.assertEqual(actual, [{"query": q} for q in queries])
 
 
 if __name__ == "__main__":
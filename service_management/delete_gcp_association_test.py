@@ -40,11 +40,22 @@ class DeleteGCPAssociationTest(unittest.TestCase):
         ["--organization_id=-1"])
     self.assertIsNone(actual)
 
+  def test_initialize_command_line_args_organization_id_range(self):
+    for organization_id in (0, 2**64 - 1):
+      actual = delete_gcp_association.initialize_command_line_args(
+          [f"--organization_id={organization_id}"])
+      self.assertIsNotNone(actual)
+    for organization_id in (2**64, 2**65 + 1, -1, -2**64):
+      actual = delete_gcp_association.initialize_command_line_args(
+          [f"--organization_id={organization_id}"])
+      self.assertIsNone(actual)
+
   @mock.patch.object(requests, "AuthorizedSession", autospec=True)
   @mock.patch.object(requests.requests, "Response", autospec=True)
   def test_http_error(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
     type(mock_response).status_code = mock.PropertyMock(return_value=400)
+    mock_response.content = b"error details"
     mock_response.raise_for_status.side_effect = (
         requests.requests.exceptions.HTTPError())
 
@@ -34,6 +34,10 @@ SERVICE_MANAGEMENT_API_BASE_URL = "https://chronicleservicemanager.googleapis.co
 
 AUTHORIZATION_SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
 
+# GCP organization IDs are unsigned 64-bit integers, so none of these bits
+# may be set (negative integers have all of them set).
+_U64_MASK_INV = ~((1 << 64) - 1)
+
 
 def initialize_command_line_args(
     args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
@@ -48,7 +52,7 @@ def initialize_command_line_args(
 
   # Sanity checks for the command-line arguments.
   parsed_args = parser.parse_args(args)
-  if parsed_args.organization_id >= 2**64 or parsed_args.organization_id < 0:
+  if parsed_args.organization_id & _U64_MASK_INV:
     print("Error: organization ID should not be bigger than 2^64")
     return None
 
@@ -82,6 +86,6 @@ if __name__ == "__main__":
   if not cli:
     sys.exit(1)  # A sanity check failed.
 
-  session = chronicle_auth.initialize_http_session(
+  session = chronicle_auth.get_cached_http_session(
       cli.credentials_file, scopes=AUTHORIZATION_SCOPES)
   get_gcp_settings(session, cli.organization_id)
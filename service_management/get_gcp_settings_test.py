@@ -44,7 +44,7 @@ class GetGCPSettingsTest(unittest.TestCase):
   @mock.patch.object(requests.requests, "Response", autospec=True)
   def test_http_error(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(return_value=400)
+    mock_response.status_code = 400
     mock_response.raise_for_status.side_effect = (
         requests.requests.exceptions.HTTPError())
 
@@ -55,7 +55,7 @@ class GetGCPSettingsTest(unittest.TestCase):
   @mock.patch.object(requests.requests, "Response", autospec=True)
   def test_happy_path(self, mock_response, mock_session):
     mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(return_value=200)
+    mock_response.status_code = 200
 
     get_gcp_settings.get_gcp_settings(mock_session, 123)
 
@@ -35,6 +35,10 @@ SERVICE_MANAGEMENT_API_BASE_URL = "https://chronicleservicemanager.googleapis.co
 
 AUTHORIZATION_SCOPES = ["https://www.googleapis.com/auth/cloud-platform"]
 
+# GCP organization IDs are unsigned 64-bit integers, so none of these bits
+# may be set (negative integers have all of them set).
+_U64_MASK_INV = ~((1 << 64) - 1)
+
 PATTERN = re.compile(r"[a-z\d]{8}-[a-z\d]{4}-[a-z\d]{4}-[a-z\d]{4}-[a-z\d]{12}")
 
 
@@ -59,7 +63,7 @@ def initialize_command_line_args(
 
   # Sanity checks for the command-line arguments.
   parsed_args = parser.parse_args(args)
-  if parsed_args.organization_id >= 2**64 or parsed_args.organization_id < 0:
+  if parsed_args.organization_id & _U64_MASK_INV:
     print("Error: organization ID should not be bigger than 2^64")
     return None
   if PATTERN.fullmatch(parsed_args.filter_id) is None:
@@ -107,7 +111,7 @@ if __name__ == "__main__":
   if not cli:
     sys.exit(1)  # A confidence check failed.
 
-  session = chronicle_auth.initialize_http_session(
+  session = chronicle_auth.get_cached_http_session(
       cli.credentials_file, scopes=AUTHORIZATION_SCOPES)
   update_gcp_log_flow_filter(session, cli.organization_id, cli.filter_id,
                              cli.filter_expression)
@@ -21,31 +21,52 @@ https://cloud.devsite.corp.google.com/chronicle/docs/reference/uppercase-api#get
 """
 
 import argparse
-import json
 import sys
 from typing import Any, Mapping, Optional, Sequence
 
 from google.auth.transport import requests
 
 from common import chronicle_auth
+from common import fast_json
+from common import http_errors
 from common import regions
 
 CHRONICLE_API_BASE_URL = "https://backstory.googleapis.com"
 
+_PARSER: Optional[argparse.ArgumentParser] = None
 
-def initialize_command_line_args(
-    args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
-  """Initializes and checks all the command-line arguments."""
+
+def _build_parser() -> argparse.ArgumentParser:
+  """Builds the command-line argument parser."""
   parser = argparse.ArgumentParser()
   chronicle_auth.add_argument_credentials_file(parser)
   regions.add_argument_region(parser)
   parser.add_argument(
       "-i", "--id", type=str, required=True, help="alert identifier")
+  parser.add_argument(
+      "--dry_run",
+      action="store_true",
+      help=("only print the URL of the request, without authenticating or " +
+            "sending it"))
+  return parser
+
 
-  parsed_args = parser.parse_args(args)
+def initialize_command_line_args(
+    args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
+  """Initializes and checks all the command-line arguments."""
+  global _PARSER
+  if _PARSER is None:
+    _PARSER = _build_parser()
+
+  parsed_args = _PARSER.parse_args(args)
   return parsed_args
 
 
+def _get_alert_url(uppercase_alert_id: str) -> str:
+  """Returns the URL of the GetAlert endpoint in the current region."""
+  return f"{CHRONICLE_API_BASE_URL}/v1/uppercaseAlerts/{uppercase_alert_id}"
+
+
 def get_alert(http_session: requests.AuthorizedSession,
               uppercase_alert_id: str) -> Mapping[str, Sequence[Any]]:
   """Retrieves the content of a specific Uppercase alert.
@@ -69,13 +90,10 @@ def get_alert(http_session: requests.AuthorizedSession,
     requests.exceptions.HTTPError: HTTP request resulted in an error
     (response.status_code >= 400).
   """
-  url = f"{CHRONICLE_API_BASE_URL}/v1/uppercaseAlerts/{uppercase_alert_id}"
-  response = http_session.request("GET", url)
+  response = http_session.request("GET", _get_alert_url(uppercase_alert_id))
 
-  if response.status_code >= 400:
-    print(response.text)
-  response.raise_for_status()
-  return response.json()
+  http_errors.raise_for_status(response)
+  return fast_json.loads(response.content)
 
 
 if __name__ == "__main__":
@@ -84,5 +102,9 @@ if __name__ == "__main__":
     sys.exit(1)  # A sanity check failed.
 
   CHRONICLE_API_BASE_URL = regions.url(CHRONICLE_API_BASE_URL, cli.region)
+  if cli.dry_run:
+    print(_get_alert_url(cli.id))
+    sys.exit(0)
+
   session = chronicle_auth.initialize_http_session(cli.credentials_file)
-  print(json.dumps(get_alert(session, cli.id), indent=2))
+  print(fast_json.dumps(get_alert(session, cli.id)))
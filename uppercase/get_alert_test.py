@@ -25,32 +25,38 @@ from . import get_alert
 class GetAlertTest(unittest.TestCase):
 
   def test_initialize_command_line_args(self):
-    actual = get_alert.initialize_command_line_args(["--id=1"])
-    self.assertIsNotNone(actual)
-
-  def test_initialize_command_line_args_short(self):
-    actual = get_alert.initialize_command_line_args(["-i=1"])
-    self.assertIsNotNone(actual)
+    for args in (["--id=1"], ["-i=1"]):
+      actual = get_alert.initialize_command_line_args(args)
+      self.assertEqual(actual.id, "1")
 
   @mock.patch.object(requests, "AuthorizedSession", autospec=True)
-  @mock.patch.object(requests.requests, "Response", autospec=True)
-  def test_http_error(self, mock_response, mock_session):
-    mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(return_value=400)
+  def test_http_error(self, mock_session):
+    mock_response = mock.Mock(status_code=400, content=b"error details")
     mock_response.raise_for_status.side_effect = (
         requests.requests.exceptions.HTTPError())
+    mock_session.request.return_value = mock_response
 
     with self.assertRaises(requests.requests.exceptions.HTTPError):
       get_alert.get_alert(mock_session, "1")
 
   @mock.patch.object(requests, "AuthorizedSession", autospec=True)
-  @mock.patch.object(requests.requests, "Response", autospec=True)
-  def test_get_alert(self, mock_response, mock_session):
-    mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(return_value=200)
-    mock_response.json.return_value = {"mock": "json"}
+  def test_get_alert(self, mock_session):
+    mock_session.request.return_value = mock.Mock(
+        status_code=200, content=b'{"mock": "json"}')
     actual = get_alert.get_alert(mock_session, "1")
     self.assertEqual(actual, {"mock": "json"})
+    mock_session.request.assert_called_once_with(
+        "GET", "https://backstory.googleapis.com/v1/uppercaseAlerts/1")
+
+  @mock.patch.object(get_alert, "CHRONICLE_API_BASE_URL",
+                     "https://europe-backstory.googleapis.com")
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_get_alert_region(self, mock_session):
+    mock_session.request.return_value = mock.Mock(
+        status_code=200, content=b"{}")
+    get_alert.get_alert(mock_session, "1")
+    mock_session.request.assert_called_once_with(
+        "GET", "https://europe-backstory.googleapis.com/v1/uppercaseAlerts/1")
 
 
 if __name__ == "__main__":
@@ -21,21 +21,23 @@ https://cloud.devsite.corp.google.com/chronicle/docs/reference/uppercase-api#lis
 """
 
 import argparse
-import json
 import sys
-from typing import Optional, Sequence
+from typing import Any, Iterator, Mapping, Optional, Sequence
 
 from google.auth.transport import requests
 
 from common import chronicle_auth
+from common import fast_json
+from common import http_errors
 from common import regions
 
 CHRONICLE_API_BASE_URL = "https://backstory.googleapis.com"
 
+_PARSER: Optional[argparse.ArgumentParser] = None
 
-def initialize_command_line_args(
-    args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
-  """Initializes and checks all the command-line arguments."""
+
+def _build_parser() -> argparse.ArgumentParser:
+  """Builds the command-line argument parser."""
   parser = argparse.ArgumentParser()
   chronicle_auth.add_argument_credentials_file(parser)
   regions.add_argument_region(parser)
@@ -51,11 +53,48 @@ def initialize_command_line_args(
       type=str,
       required=False,
       help=("page token from a previous ListAlerts call used for pagination"))
+  parser.add_argument(
+      "-a",
+      "--all_pages",
+      action="store_true",
+      help=("keep fetching the next pages of alerts until there are no more, " +
+            "instead of only one page"))
+  parser.add_argument(
+      "--dry_run",
+      action="store_true",
+      help=("only print the URL of the request, without authenticating or " +
+            "sending it"))
+  return parser
 
-  parsed_args = parser.parse_args(args)
+
+def initialize_command_line_args(
+    args: Optional[Sequence[str]] = None) -> Optional[argparse.Namespace]:
+  """Initializes and checks all the command-line arguments."""
+  global _PARSER
+  if _PARSER is None:
+    _PARSER = _build_parser()
+
+  parsed_args = _PARSER.parse_args(args)
   return parsed_args
 
 
+def _list_alerts_url() -> str:
+  """Returns the URL of the ListAlerts endpoint in the current region."""
+  return f"{CHRONICLE_API_BASE_URL}/v1/uppercaseAlerts"
+
+
+def _list_alerts_params(page_size: Optional[int],
+                        page_token: str) -> Mapping[str, Any]:
+  """Returns the query parameters of a ListAlerts request."""
+  # Omit the default (empty) values, instead of sending them to the server.
+  params = {}
+  if page_size:
+    params["page_size"] = page_size
+  if page_token:
+    params["page_token"] = page_token
+  return params
+
+
 def list_alerts(http_session: requests.AuthorizedSession,
                 page_size: Optional[int] = 100,
                 page_token: str = "") -> Sequence[str]:
@@ -77,17 +116,42 @@ def list_alerts(http_session: requests.AuthorizedSession,
     requests.exceptions.HTTPError: HTTP request resulted in an error
     (response.status_code >= 400).
   """
-  url = f"{CHRONICLE_API_BASE_URL}/v1/uppercaseAlerts"
-  params = {"page_token": page_token, "page_size": page_size}
-  response = http_session.request("GET", url, params=params)
-
-  if response.status_code >= 400:
-    print(response.text)
-  response.raise_for_status()
-  j = response.json()
+  params = _list_alerts_params(page_size, page_token)
+  response = http_session.request("GET", _list_alerts_url(), params=params)
+
+  http_errors.raise_for_status(response)
+  j = fast_json.loads(response.content)
   return j.get("uppercaseAlerts", []), j.get("nextPageToken", "")
 
 
+def iter_alerts(http_session: requests.AuthorizedSession,
+                page_size: Optional[int] = 100,
+                page_token: str = "") -> Iterator[Mapping[str, Any]]:
+  """Yields Uppercase alerts one by one, from all the pages.
+
+  Pages are fetched lazily, over the same session, so callers that iterate
+  over many alerts hold only one page in memory at a time.
+
+  Args:
+    http_session: Authorized session for HTTP requests.
+    page_size: Same as in list_alerts().
+    page_token: Page token to start from. Optional - the first page is
+      retrieved if the token is the empty string or a None value.
+
+  Yields:
+    Uppercase alerts, in the same order as list_alerts() returns them.
+
+  Raises:
+    requests.exceptions.HTTPError: HTTP request resulted in an error
+    (response.status_code >= 400).
+  """
+  while True:
+    alerts, page_token = list_alerts(http_session, page_size, page_token)
+    yield from alerts
+    if not page_token:
+      return
+
+
 if __name__ == "__main__":
   cli = initialize_command_line_args()
   if not cli:
@@ -96,7 +160,19 @@ if __name__ == "__main__":
   token, size = cli.page_token, cli.page_size
 
   CHRONICLE_API_BASE_URL = regions.url(CHRONICLE_API_BASE_URL, cli.region)
-  session = chronicle_auth.initialize_http_session(cli.credentials_file)
-  uppercase_alerts, next_page_token = list_alerts(session, size, token)
-  print(json.dumps(uppercase_alerts, indent=2))
+  if cli.dry_run:
+    request = requests.requests.Request(
+        "GET", _list_alerts_url(), params=_list_alerts_params(size, token))
+    print(request.prepare().url)
+    sys.exit(0)
+
+  # All the pages are fetched over the same session (i.e. the same OAuth token
+  # and keep-alive connection).
+  session = chronicle_auth.get_cached_http_session(cli.credentials_file)
+  if cli.all_pages:
+    uppercase_alerts = list(iter_alerts(session, size, token))
+    next_page_token = ""
+  else:
+    uppercase_alerts, next_page_token = list_alerts(session, size, token)
+  print(fast_json.dumps(uppercase_alerts))
   print(f"Next page token: {next_page_token}")
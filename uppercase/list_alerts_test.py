@@ -14,6 +14,8 @@
 #
 """Tests for the "list_alerts" module."""
 
+import io
+import json
 import unittest
 from unittest import mock
 
@@ -22,39 +24,95 @@ from google.auth.transport import requests
 from . import list_alerts
 
 
+def _response(json_value):
+  """Returns a successful HTTP response with the given JSON body."""
+  return mock.Mock(status_code=200, content=json.dumps(json_value).encode())
+
+
 class ListAlertsTest(unittest.TestCase):
 
   def test_initialize_command_line_args(self):
     actual = list_alerts.initialize_command_line_args(["--page_size=5"])
     self.assertIsNotNone(actual)
+    self.assertFalse(actual.all_pages)
+    self.assertFalse(actual.dry_run)
+
+  def test_initialize_command_line_args_all_pages(self):
+    actual = list_alerts.initialize_command_line_args(["-a"])
+    self.assertTrue(actual.all_pages)
+
+  def test_initialize_command_line_args_dry_run(self):
+    actual = list_alerts.initialize_command_line_args(["--dry_run"])
+    self.assertTrue(actual.dry_run)
 
+  @mock.patch("sys.stderr", new_callable=io.StringIO)
   @mock.patch.object(requests, "AuthorizedSession", autospec=True)
-  @mock.patch.object(requests.requests, "Response", autospec=True)
-  def test_http_error(self, mock_response, mock_session):
-    mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(return_value=400)
+  def test_http_error(self, mock_session, mock_stderr):
+    mock_response = mock.Mock(status_code=400, content=b"error details")
     mock_response.raise_for_status.side_effect = (
         requests.requests.exceptions.HTTPError())
+    mock_session.request.return_value = mock_response
 
     with self.assertRaises(requests.requests.exceptions.HTTPError):
       list_alerts.list_alerts(mock_session)
+    self.assertEqual(mock_stderr.getvalue(), "error details\n")
 
   @mock.patch.object(requests, "AuthorizedSession", autospec=True)
-  @mock.patch.object(requests.requests, "Response", autospec=True)
-  def test_list_alerts(self, mock_response, mock_session):
-    mock_session.request.return_value = mock_response
-    type(mock_response).status_code = mock.PropertyMock(return_value=200)
-
+  def test_list_alerts(self, mock_session):
     expected_alert = {"alertId": "1"}
     expected_page_token = "page token here"
-    mock_response.json.return_value = {
+    mock_session.request.return_value = _response({
         "uppercaseAlerts": [expected_alert],
         "nextPageToken": expected_page_token,
-    }
+    })
 
     alerts, next_page_token = list_alerts.list_alerts(mock_session)
-    self.assertCountEqual(alerts, [expected_alert])
+    self.assertEqual(alerts, [expected_alert])
     self.assertEqual(next_page_token, expected_page_token)
+    mock_session.request.assert_called_once_with(
+        "GET",
+        "https://backstory.googleapis.com/v1/uppercaseAlerts",
+        params={"page_size": 100})
+
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_list_alerts_page_token(self, mock_session):
+    mock_session.request.return_value = _response({})
+    alerts, next_page_token = list_alerts.list_alerts(
+        mock_session, page_size=None, page_token="token")
+    self.assertEqual(alerts, [])
+    self.assertEqual(next_page_token, "")
+    mock_session.request.assert_called_once_with(
+        "GET",
+        "https://backstory.googleapis.com/v1/uppercaseAlerts",
+        params={"page_token": "token"})
+
+  @mock.patch.object(list_alerts, "CHRONICLE_API_BASE_URL",
+                     "https://europe-backstory.googleapis.com")
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_list_alerts_region(self, mock_session):
+    mock_session.request.return_value = _response({})
+    list_alerts.list_alerts(mock_session)
+    self.assertEqual(
+        mock_session.request.call_args.args[1],
+        "https://europe-backstory.googleapis.com/v1/uppercaseAlerts")
+
+  @mock.patch.object(requests, "AuthorizedSession", autospec=True)
+  def test_iter_alerts(self, mock_session):
+    mock_session.request.side_effect = [
+        _response({
+            "uppercaseAlerts": [{"alertId": "1"}, {"alertId": "2"}],
+            "nextPageToken": "token",
+        }),
+        _response({"uppercaseAlerts": [{"alertId": "3"}]}),
+    ]
+    alerts = list_alerts.iter_alerts(mock_session)
+    self.assertEqual([a["alertId"] for a in alerts], ["1", "2", "3"])
+    self.assertEqual(mock_session.request.call_count, 2)
+    self.assertEqual(
+        mock_session.request.call_args.kwargs["params"], {
+            "page_size": 100,
+            "page_token": "token"
+        })
 
 
 if __name__ == "__main__":